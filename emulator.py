@@ -3,73 +3,141 @@ Simple UDP proxy that forwards between sender and receiver while introducing
 packet loss, delay, and jitter. Run as the middleman.
 """
 
+import asyncio
+import logging
 import socket
-import threading
-import random
-import time
+import sys
 import argparse
 
+from utils import start_stdout_logging, tune_socket_buffers
+
 # CONFIG
 # Proxy to intercept sender & receiver packets
 EMULATOR_PROXY = ('127.0.0.1', 11000)
 RECEIVER_ADDR = ('127.0.0.1', 12001)
 SENDER_ADDR = ('127.0.0.1', 12000)
-VERBOSE = True
+RECV_BATCH = 64  # Max datagrams drained per readiness event
+SAMPLE_POOL_SIZE = 1 << 16  # Drop/delay samples generated per refill
 
+# Per-packet logs are DEBUG; --quiet raises the level so they are never formatted
+log = logging.getLogger("emulator")
 
-def run_emulator():
-    """Main emulator loop. Call this only when running emulator.py directly."""
+
+def _src_label(addr):
+    if addr[1] == SENDER_ADDR[1]:
+        return "SENDER"
+    if addr[1] == RECEIVER_ADDR[1]:
+        return "RECEIVER"
+    return f"UNKNOWN({addr})"
+
+
+class Emulator:
+    """
+    Forwards datagrams between sender and receiver on a single event loop.
+    Each readiness event drains up to RECV_BATCH datagrams from the socket
+    before processing them, and delayed forwards are scheduled with
+    loop.call_later (timer heap), so no thread is created per packet.
+    Forwards leave from the proxy socket itself, so each peer sees the proxy
+    as its only correspondent and can keep its own socket connect()ed to it.
+    """
+
+    def __init__(self, loop, sock):
+        self.loop = loop
+        self.sock = sock  # Bound to EMULATOR_PROXY
+        self.debug = log.isEnabledFor(logging.DEBUG)
+
+        # Imported here so sender.py/receiver.py can import the addresses above without NumPy
+        import numpy as np
+        self.rng = np.random.default_rng()
+        self._refill_samples()
+
+    def _refill_samples(self):
+        # Draw drop decisions and whole-ms delays in bulk, with the loss threshold,
+        # mean delay and clamp at 0 already applied; lists keep per-packet indexing cheap
+        jitter_ms = int(round(JITTER_MS))
+        self.drop_samples = (self.rng.random(SAMPLE_POOL_SIZE) < LOSS_RATE).tolist()
+        jitter = self.rng.integers(-jitter_ms, jitter_ms, SAMPLE_POOL_SIZE, endpoint=True)
+        self.delay_samples = (MEAN_DELAY_MS + jitter).clip(min=0).tolist()
+        self.sample_idx = 0
+
+    def on_readable(self):
+        packets = []
+        for _ in range(RECV_BATCH):
+            try:
+                packets.append(self.sock.recvfrom(65536))
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                # e.g. ICMP port unreachable while a peer is not running yet
+                continue
+        for data, addr in packets:
+            self.handle(data, addr)
+
+    def handle(self, data, addr):
+        # Determine direction
+        dest = SENDER_ADDR if addr[1] == RECEIVER_ADDR[1] else RECEIVER_ADDR
+
+        if self.sample_idx == SAMPLE_POOL_SIZE:
+            self._refill_samples()
+        i = self.sample_idx
+        self.sample_idx = i + 1
+
+        # Simulate loss
+        if self.drop_samples[i]:
+            if self.debug:
+                log.debug("[EMULATOR] DROPPED pkt from %s (%s) -> %s",
+                          _src_label(addr), addr, dest)
+            return
+
+        # Delay + jitter
+        delay_ms = self.delay_samples[i]
+        if self.debug:
+            log.debug("[EMULATOR] received %d bytes from %s -> scheduling forward (%.1fms)",
+                      len(data), _src_label(addr), delay_ms)
+        self.loop.call_later(delay_ms / 1000.0, self._send, data, dest)
+
+    def _send(self, data, dest):
+        try:
+            self.sock.sendto(data, dest)
+        except OSError:
+            # Send buffer full or peer not running: treat like a drop on the link
+            pass
+
+
+async def _serve():
+    loop = asyncio.get_running_loop()
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    tune_socket_buffers(sock)
     sock.bind(EMULATOR_PROXY)
-    sock.setblocking(True)
-
-    def send_with_delay(data, dest, delay_ms):
-        def _send():
-            if VERBOSE:
-                print(
-                    f"[EMULATOR] sleeping {delay_ms:.1f}ms then forwarding to {dest}")
-            time.sleep(delay_ms / 1000.0)
-            sock.sendto(data, dest)
-        t = threading.Thread(target=_send, daemon=True)
-        t.start()
+    sock.setblocking(False)
+    emulator = Emulator(loop, sock)
+    loop.add_reader(sock.fileno(), emulator.on_readable)
+    try:
+        await loop.create_future()  # Run until interrupted
+    finally:
+        loop.remove_reader(sock.fileno())
+        sock.close()
+
 
+def run_emulator():
+    """Main emulator loop. Call this only when running emulator.py directly."""
     print("[EMULATOR] running at", EMULATOR_PROXY)
     print("[EMULATOR] forwarding between sender",
           SENDER_ADDR, "and receiver", RECEIVER_ADDR)
     print(
         f"[EMULATOR] LOSS={LOSS_RATE*100:.1f}%, mean_delay={MEAN_DELAY_MS}ms, jitter={JITTER_MS}ms\n")
 
+    # add_reader needs a selector loop; Windows defaults to the proactor loop
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    log_listener = start_stdout_logging()
     try:
-        while True:
-            data, addr = sock.recvfrom(65536)
-
-            # Determine direction
-            if addr[1] == SENDER_ADDR[1]:
-                dest = RECEIVER_ADDR
-                src_label = "SENDER"
-            elif addr[1] == RECEIVER_ADDR[1]:
-                dest = SENDER_ADDR
-                src_label = "RECEIVER"
-            else:
-                dest = RECEIVER_ADDR
-                src_label = f"UNKNOWN({addr})"
-
-            # Simulate loss
-            if random.random() < LOSS_RATE:
-                if VERBOSE:
-                    print(
-                        f"[EMULATOR] DROPPED pkt from {src_label} ({addr}) -> {dest}")
-                continue
-
-            # Delay + jitter
-            jitter = random.uniform(-JITTER_MS, JITTER_MS)
-            delay_ms = max(0.0, MEAN_DELAY_MS + jitter)
-            if VERBOSE:
-                print(
-                    f"[EMULATOR] received {len(data)} bytes from {src_label} -> scheduling forward ({delay_ms:.1f}ms)")
-            send_with_delay(data, dest, delay_ms)
+        asyncio.run(_serve())
     except KeyboardInterrupt:
-        print("\n[EMULATOR] shutting down")
+        pass
+    finally:
+        log_listener.stop()
+    print("\n[EMULATOR] shutting down")
 
 
 if __name__ == "__main__":
@@ -87,6 +155,6 @@ if __name__ == "__main__":
     LOSS_RATE = max(0.0, min(1.0, args.loss))
     MEAN_DELAY_MS = max(0.0, args.delay)
     JITTER_MS = max(0.0, args.jitter)
-    VERBOSE = not args.quiet
+    log.setLevel(logging.INFO if args.quiet else logging.DEBUG)
 
     run_emulator()
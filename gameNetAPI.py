@@ -1,15 +1,58 @@
 from collections import deque
+import asyncio
+import heapq
+import logging
 import socket
 import threading
-import time
+from types import MethodType
 
+from batch_io import BatchReader, BatchWriter
 from metrics import ReceiverMetrics, SenderMetrics
-from utils import RELIABLE_CHANNEL, UNRELIABLE_CHANNEL, increment_seq, now_ms, pack_packet, unpack_packet
+from utils import (ACK_BITMAP_BITS, HEADER_SIZE, RELIABLE_CHANNEL, UNRELIABLE_CHANNEL,
+                   SEQ_MASK, SEQ_SPACE, is_ack, now_ms, pack_ack, pack_header, tune_socket_buffers,
+                   unpack_ack_seqs, unpack_packet)
 
 # Timeout t beyond which reliable packet is dropped = 200ms
 RETRANSMIT_TIMEOUT_MS = 200
 RETRANSMIT_INTERVAL_MS = 40  # Time delta between each retransmission attempt
 MAX_RETRANSMIT_ATTEMPTS = 5  # 5 attempts * 40ms = 200ms <= timeout t
+# Max datagrams read per readiness wake-up before re-checking timers
+RECV_DRAIN_MAX = 64
+# Unreliable FIFO ring capacity (power of two); the oldest packet is dropped when full
+UNRELIABLE_CAPACITY = 4096
+UNRELIABLE_MASK = UNRELIABLE_CAPACITY - 1
+# Receiver batches ACKs: flush after ACK_BATCH_MAX seqs or once the oldest has waited ACK_DELAY_MS
+ACK_BATCH_MAX = 8
+ACK_DELAY_MS = 10
+# Max packets queued by send(..., flush=False) before they are flushed automatically
+TX_BATCH_MAX = 32
+# Scatter-gather sends (header + payload in one syscall); not available on Windows
+HAS_SENDMSG = hasattr(socket.socket, "sendmsg")
+
+
+# Per-packet diagnostics; silent unless the application enables DEBUG on this logger
+log = logging.getLogger("gameNetAPI")
+
+
+def _start_io_loop(sock, on_readable):
+    # One selector event loop per endpoint on a daemon thread: socket reads (add_reader) and
+    # timers (call_later) run as callbacks on it instead of on dedicated polling threads
+    loop = asyncio.SelectorEventLoop()
+    loop.add_reader(sock.fileno(), on_readable)
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    return loop, thread
+
+
+def _stop_io_loop(loop, thread, sock):
+    # Pending timers are discarded by loop.close()
+    def shutdown():
+        loop.remove_reader(sock.fileno())
+        loop.stop()
+    loop.call_soon_threadsafe(shutdown)
+    thread.join()
+    loop.close()
+    sock.close()
 
 
 class GameNetAPI:
@@ -20,123 +63,179 @@ class GameNetAPI:
             self.sock = GameNetAPI.Receiver(src_socket_addr, dest_socket_addr)
     
     def __getattr__(self, name):
-        # Delegate attribute access to self.sock
-        return getattr(self.sock, name)
+        # Delegate attribute access to self.sock. Bound methods are cached on the wrapper so
+        # per-packet calls (send, recv) skip this fallback after the first lookup; data
+        # attributes such as seq_to_send keep going through it to stay current
+        value = getattr(self.sock, name)
+        if isinstance(value, MethodType):
+            setattr(self, name, value)
+        return value
 
     class Sender:
         def __init__(self, src_socket_addr, dest_socket_addr):
             self.src_socket_addr = src_socket_addr
             self.dest_socket_addr = dest_socket_addr
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            tune_socket_buffers(self.sock)
             self.sock.bind(src_socket_addr)
+            # UDP connect() only fixes the peer: sends skip the per-call address conversion
+            # and the kernel filters out datagrams from anyone else
+            self.sock.connect(dest_socket_addr)
             self.sock.setblocking(False)
 
             self.seq_to_send = 0
-            # sent_seq -> (sent_time, num retransmit attempts, payload)
-            self.pending_acks = {}
-            self.pending_acks_lock = threading.Lock()
+            # Unacked reliable packets as parallel arrays indexed by seq (no dict per packet):
+            # (header, payload) or None once ACKed/dropped, and send attempts (retransmit times live
+            # in the deadlines heap). Owned by the I/O loop thread only, so they need no lock
+            self.pending_packets = [None] * SEQ_SPACE
+            self.attempts = bytearray(SEQ_SPACE)
+            # SPSC handoff from send() into the I/O loop (deque append/popleft are atomic):
+            # (seq, (header, payload), send_time)
+            self.new_sent = deque()
+            # Min-heap of (retransmit_deadline_ms, seq); ACKed seqs are skipped lazily on pop
+            self.deadlines = []
+            # Single timer handle firing _retransmit at the heap head; retransmit_armed is False
+            # while the heap is empty, so send() knows it must wake the loop
+            self.retransmit_timer = None
+            self.retransmit_armed = False
+            # Batched ACK reader over preallocated buffers (_on_ack_readable only)
+            self.ack_reader = BatchReader(self.sock, RECV_DRAIN_MAX)
+
+            # Packets queued by send(..., flush=False), sent together by flush() (caller's thread only)
+            self.tx_batch = []
+            self.tx_writer = BatchWriter(self.sock, TX_BATCH_MAX)
 
             self.metrics = SenderMetrics()
 
-            self.recv_ack_thread = threading.Thread(
-                target=self._recv_ack, daemon=True)
-            self.retransmit_thread = threading.Thread(
-                target=self._retransmit, daemon=True)
-            self.running_threads = True
-            self.recv_ack_thread.start()
-            self.retransmit_thread.start()
+            self.loop, self.io_thread = _start_io_loop(self.sock, self._on_ack_readable)
 
-        def send(self, payload: str, is_reliable) -> int:
+        def send(self, payload: str, is_reliable, flush=True) -> int:
+            # flush=False queues the packet so several sends in one frame leave in a single
+            # sendmmsg; call flush() at the end of the frame
             ch = RELIABLE_CHANNEL if is_reliable else UNRELIABLE_CHANNEL
             seq = self.seq_to_send
             send_time = now_ms()
-            # print(f"seq={seq}, rel={is_reliable} SENT AT {send_time}ms")
-            packet = pack_packet(ch, seq, send_time, payload.encode('utf-8'))
-            self.sock.sendto(packet, self.dest_socket_addr)
-            self.metrics.update_on_send(ch, len(packet))
+            # Header and payload stay separate buffers; they are never concatenated
+            packet = (pack_header(ch, seq, send_time), payload.encode('utf-8'))
             if is_reliable:
-                with self.pending_acks_lock:
-                    self.pending_acks[seq] = {
-                        "packet": packet,
-                        "sent_time": send_time,
-                        "first_sent_time": send_time,
-                        "attempts": 1
-                    }
-            self.seq_to_send = increment_seq(seq)
+                # Hand off before sending so the ACK can never overtake it
+                self.new_sent.append((seq, packet, send_time))
+                if not self.retransmit_armed:
+                    self.retransmit_armed = True
+                    self.loop.call_soon_threadsafe(self._retransmit)
+            if flush and not self.tx_batch:
+                self._send_packet(packet)
+            else:
+                self.tx_batch.append(packet)
+                if flush or len(self.tx_batch) >= TX_BATCH_MAX:
+                    self.flush()
+            self.metrics.update_on_send(ch, HEADER_SIZE + len(packet[1]))
+            self.seq_to_send = (seq + 1) & SEQ_MASK
             return seq
 
+        def flush(self):
+            if self.tx_batch:
+                self.tx_writer.send(self.tx_batch)
+                self.tx_batch = []
+
+        def _send_packet(self, packet):
+            # packet is (header, payload); sendmsg gathers both in the kernel
+            try:
+                if HAS_SENDMSG:
+                    self.sock.sendmsg(packet)
+                else:
+                    self.sock.send(b"".join(packet))
+            except ConnectionRefusedError:
+                # ICMP port unreachable reported on the connected socket: peer not up, packet lost
+                pass
+
         def close(self):
-            self.running_threads = False
-            self.sock.close()
-
-        def _recv_ack(self):
-            while self.running_threads:
-                try:
-                    data, _ = self.sock.recvfrom(65536)
-                except BlockingIOError:
-                    time.sleep(0.001)
-                    continue
-                try:
-                    ch, seq, ts, payload = unpack_packet(data)
-                except Exception:
-                    continue
+            self.flush()
+            _stop_io_loop(self.loop, self.io_thread, self.sock)
 
-                if ch == UNRELIABLE_CHANNEL or not payload.startswith(b"ACK"):
-                    continue
-                with self.pending_acks_lock:
-                    info = self.pending_acks.pop(seq, None)
-                """
-                NOTE: The initial approach below to record the e2e latency from when a packet was first
-                sent, to when it finally receives the ACK is valid below. However, due to OS optimisations,
-                if socket at localhost port X receives a packet sent from localhost port Y, then sends ACK 
-                right after back to port Y, this ACK will always take between 0 and 1 ms (instead of the 
-                usual 5-10ms) to reach the dst. This 'localhost short-circuit' optimisation renders the
-                2nd leg (ACK packet)'s latency invalid to be included in our performance metrics, because
-                it will underestimate the latency of the reliable channel by almost 50%.
-
-                Therefore, the block of code below is commented out, as we will derive latency metrics all
-                on the receiver's side instead, where e2e latency is from when a packet was first sent, to
-                when it finally gets pushed to the receiver application. In other words, e2e latency of a
-                packet = one-way network latency (from sender to receiver) + buffer latency (from receiver to
-                application)
-                """
-                # if info is not None:
-                #     nowt = now_ms()
-                #     # Compute reliable one-way latency from first send to ACK arrival, divided by 2
-                #     rtt_from_first = nowt - \
-                #         info.get("first_sent_time", info["sent_time"])
-                #     print(f"seq={seq}, ch={ch} RECEIVED ACK AT {nowt}. First sent time is {info.get("first_sent_time", info["sent_time"])}.")
-                #     reliable_latency = rtt_from_first / 2.0
-                #     self.metrics.update_on_reliable_latency(reliable_latency)
+        def _on_ack_readable(self):
+            # ACKs may cover sends the loop has not picked up yet
+            self._drain_new_sent()
+            pending_packets = self.pending_packets
+            # Drain every ready ACK per wake-up (a single recvmmsg on Linux)
+            for data in self.ack_reader.read():
+                # Only the header and ACK marker matter here; skip decoding the payload
+                if is_ack(data):
+                    for seq in unpack_ack_seqs(data):
+                        pending_packets[seq] = None
+            """
+            NOTE: The initial approach below to record the e2e latency from when a packet was first
+            sent, to when it finally receives the ACK is valid below. However, due to OS optimisations,
+            if socket at localhost port X receives a packet sent from localhost port Y, then sends ACK 
+            right after back to port Y, this ACK will always take between 0 and 1 ms (instead of the 
+            usual 5-10ms) to reach the dst. This 'localhost short-circuit' optimisation renders the
+            2nd leg (ACK packet)'s latency invalid to be included in our performance metrics, because
+            it will underestimate the latency of the reliable channel by almost 50%.
+
+            Therefore, the block of code below is commented out, as we will derive latency metrics all
+            on the receiver's side instead, where e2e latency is from when a packet was first sent, to
+            when it finally gets pushed to the receiver application. In other words, e2e latency of a
+            packet = one-way network latency (from sender to receiver) + buffer latency (from receiver to
+            application)
+            """
+            # if info is not None:
+            #     nowt = now_ms()
+            #     # Compute reliable one-way latency from first send to ACK arrival, divided by 2
+            #     rtt_from_first = nowt - \
+            #         info.get("first_sent_time", info["sent_time"])
+            #     print(f"seq={seq}, ch={ch} RECEIVED ACK AT {nowt}. First sent time is {info.get("first_sent_time", info["sent_time"])}.")
+            #     reliable_latency = rtt_from_first / 2.0
+            #     self.metrics.update_on_reliable_latency(reliable_latency)
+
+        def _drain_new_sent(self):
+            while self.new_sent:
+                seq, packet, send_time = self.new_sent.popleft()
+                self.pending_packets[seq] = packet
+                self.attempts[seq] = 1
+                heapq.heappush(
+                    self.deadlines, (send_time + RETRANSMIT_INTERVAL_MS, seq))
 
         def _retransmit(self):
-            while self.running_threads:
-                time.sleep(0.01)
-                now = now_ms()
-                to_retransmit = []
-                with self.pending_acks_lock:
-                    for seq, info in list(self.pending_acks.items()):
-                        # Not yet time to retransmit
-                        if now - info["sent_time"] <= RETRANSMIT_INTERVAL_MS:
-                            continue
-                        # Retransmit if haven't exceeded max attempts
-                        if info["attempts"] < MAX_RETRANSMIT_ATTEMPTS:
-                            to_retransmit.append(seq)
-                        else:
-                            del self.pending_acks[seq]
-                            # Drop reliable packet after timeout window (no metrics collected)
-                for seq in to_retransmit:
-                    with self.pending_acks_lock:
-                        # Retransmit packet, then update sent time and attempts info
-                        info = self.pending_acks.get(seq)
-                        if not info:
-                            continue
-                        self.sock.sendto(info["packet"], self.dest_socket_addr)
-                        info["sent_time"] = now_ms()
-                        info["attempts"] += 1
-                        self.metrics.update_on_retransmit(RELIABLE_CHANNEL)
-                        print(
-                            f"[SENDER] Retransmit seq={seq} attempt={info['attempts']}")
+            # Timer callback on the I/O loop; also scheduled directly by send() when idle
+            if self.retransmit_timer is not None:
+                self.retransmit_timer.cancel()
+                self.retransmit_timer = None
+            self._drain_new_sent()
+            # Bind hot-loop lookups to locals once instead of per retransmit
+            deadlines = self.deadlines
+            pending_packets, attempts = self.pending_packets, self.attempts
+            send_packet = self._send_packet
+            heappop, heappush = heapq.heappop, heapq.heappush
+            # Handle every entry due at this tick against one clock read
+            now = now_ms()
+            while deadlines and deadlines[0][0] <= now:
+                _, seq = heappop(deadlines)
+                packet = pending_packets[seq]
+                # Already ACKed
+                if packet is None:
+                    continue
+                # Drop reliable packet after timeout window (no metrics collected)
+                if attempts[seq] >= MAX_RETRANSMIT_ATTEMPTS:
+                    pending_packets[seq] = None
+                    continue
+                # Retransmit packet, then update attempts and its next deadline
+                send_packet(packet)
+                attempts[seq] += 1
+                heappush(deadlines, (now + RETRANSMIT_INTERVAL_MS, seq))
+                self.metrics.update_on_retransmit(RELIABLE_CHANNEL)
+                log.debug("[SENDER] Retransmit seq=%d attempt=%d", seq, attempts[seq])
+            if not deadlines:
+                # Idle until send() wakes the loop again.
+                # Disarm then re-check so a handoff racing with the disarm is not missed
+                self.retransmit_armed = False
+                self._drain_new_sent()
+                if not deadlines:
+                    return
+                self.retransmit_armed = True
+            # Sleep until the earliest deadline. New sends are always due
+            # after the current head, so they never need to cut this short
+            delay_ms = max(0, deadlines[0][0] - now)
+            self.retransmit_timer = self.loop.call_later(delay_ms / 1000.0, self._retransmit)
 
 
     class Receiver:
@@ -144,103 +243,202 @@ class GameNetAPI:
             self.src_socket_addr = src_socket_addr
             self.dest_socket_addr = dest_socket_addr
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            tune_socket_buffers(self.sock)
             self.sock.bind(src_socket_addr)
+            # UDP connect() only fixes the peer: sends skip the per-call address conversion
+            # and the kernel filters out datagrams from anyone else
+            self.sock.connect(dest_socket_addr)
             self.sock.setblocking(False)
 
             self.seq_to_recv = 0
-            # Unreliable packets buffer: FIFO queue of (recv_seq, send_ts, arrival_ts, payload)
-            self.unreliable_buffer = deque()
-            self.unreliable_seqs = set()  # To increment self.seq_to_recv if alr recv seq num
-            # Reliable packets buffer: {recv_seq -> (payload, send_ts, arrival_ts)}
-            self.reliable_buffer = {}
+            # Unreliable packets buffer: lock-free SPSC FIFO ring stored as parallel arrays (no tuple
+            # per packet), indexed by head/tail counters & UNRELIABLE_MASK. Only the I/O loop writes
+            # unreliable_tail and only recv() writes unreliable_head; plain int stores are atomic under the GIL
+            self.unreliable_seq = [0] * UNRELIABLE_CAPACITY
+            self.unreliable_send_ts = [0] * UNRELIABLE_CAPACITY
+            self.unreliable_arrival_ts = [0] * UNRELIABLE_CAPACITY
+            self.unreliable_payload = [None] * UNRELIABLE_CAPACITY
+            self.unreliable_head = 0
+            self.unreliable_tail = 0
+            # One byte per seq (not a bitmap, so neither side does a read-modify-write) marking unreliable
+            # seqs received but not yet passed by self.seq_to_recv, to increment self.seq_to_recv if alr recv seq num
+            self.unreliable_present = bytearray(SEQ_SPACE)
+            # Reliable packets indexed directly by seq (one slot per seq, like the old dict keyed
+            # by seq): (seq, payload, send_ts, arrival_ts), or None once delivered
+            self.reliable_buffer = [None] * SEQ_SPACE
             self.last_recv_time = None
+            # Reliable seqs received but not yet ACKed (I/O loop only), flushed by ack_timer at the latest
+            self.pending_ack_seqs = []
+            self.ack_timer = None
+            # Packed ACKs waiting to go out together after the current receive batch
+            self.ack_out = []
+            self.ack_writer = BatchWriter(self.sock, RECV_DRAIN_MAX)
+            # Batched reader over preallocated buffers (I/O loop only)
+            self.reader = BatchReader(self.sock, RECV_DRAIN_MAX)
 
-            self.unreliable_data_lock = threading.Lock()
-            self.reliable_data_lock = threading.Lock()
+            # Set by the I/O loop after each batch of buffered packets, so recv() can block instead of spinning
+            self.data_ready = threading.Event()
 
             self.metrics = ReceiverMetrics()
             self.metrics.start(now_ms())
 
-            self.running_threads = True
-            self.recv_thread = threading.Thread(
-                target=self._recv_and_ack, daemon=True)
-            self.recv_thread.start()
+            self.loop, self.io_thread = _start_io_loop(self.sock, self._on_readable)
 
         def recv(self, hard_timeout_ms):
-            start = now_ms()
+            # One clock read per pass, reused for delivery stamps, skip and timeout checks
+            start = now = now_ms()
             while True:
-                now = now_ms()
+                # Cleared before checking the buffers so an arrival during the checks still wakes the wait below
+                self.data_ready.clear()
                 # Receive from reliable buffer first
-                with self.reliable_data_lock:
-                    if self.seq_to_recv in self.reliable_buffer:
-                        payload, send_ts, arrival_ts = self.reliable_buffer.pop(
-                            self.seq_to_recv)
-                        seq = self.seq_to_recv
-                        self.seq_to_recv = increment_seq(seq)
-                        self.last_recv_time = now
-                        # Count metrics only on delivery to application layer
-                        self.metrics.update_on_receive(
-                            RELIABLE_CHANNEL, len(payload), send_ts, arrival_ts)
-                        return seq, RELIABLE_CHANNEL, payload
-                    # Skip seq num if timeout
-                    if (self.last_recv_time and
-                        (now - self.last_recv_time) > RETRANSMIT_TIMEOUT_MS):
-                        print(
-                            f"[RECEIVER] skipping missing seq={self.seq_to_recv}"
-                            f" ({RETRANSMIT_TIMEOUT_MS}ms timeout)")
-                        self.seq_to_recv = increment_seq(self.seq_to_recv)
-                        self.last_recv_time = now
+                # Lock-free: the I/O loop only ever stores whole entries, each seq has its own slot,
+                # and any entry left over from an earlier lap was cleared by _advance_seq_to_recv
+                entry = self.reliable_buffer[self.seq_to_recv]
+                if entry is not None:
+                    self.reliable_buffer[self.seq_to_recv] = None
+                    seq, payload, send_ts, arrival_ts = entry
+                    self._advance_seq_to_recv()
+                    self.last_recv_time = now
+                    # Count metrics only on delivery to application layer
+                    self.metrics.update_on_receive(
+                        RELIABLE_CHANNEL, len(payload), send_ts, arrival_ts, now)
+                    return seq, RELIABLE_CHANNEL, payload
+                # Skip seq num if timeout
+                if (self.last_recv_time and
+                    (now - self.last_recv_time) > RETRANSMIT_TIMEOUT_MS):
+                    log.debug("[RECEIVER] skipping missing seq=%d (%dms timeout)",
+                              self.seq_to_recv, RETRANSMIT_TIMEOUT_MS)
+                    # Clear so the marker cannot match again after the seq space wraps
+                    self._clear_unreliable_present(self.seq_to_recv)
+                    self._advance_seq_to_recv()
+                    self.last_recv_time = now
                 # Then receive from unreliable buffer
-                with self.unreliable_data_lock:
-                    if self.unreliable_buffer:
-                        if self.seq_to_recv in self.unreliable_seqs:
-                            self.unreliable_seqs.remove(self.seq_to_recv)
-                            self.seq_to_recv = increment_seq(self.seq_to_recv)
-                        seq, send_ts, arrival_ts, payload = self.unreliable_buffer.popleft()
-                        self.last_recv_time = now
-                        # Count metrics only on delivery
-                        self.metrics.update_on_receive(
-                            UNRELIABLE_CHANNEL, len(payload), send_ts, arrival_ts)
-                        return seq, UNRELIABLE_CHANNEL, payload
+                head = self.unreliable_head
+                tail = self.unreliable_tail
+                if head != tail:
+                    if self._clear_unreliable_present(self.seq_to_recv):
+                        self._advance_seq_to_recv()
+                    if tail - head >= UNRELIABLE_CAPACITY:
+                        # Producer lapped us: the oldest packets were overwritten. Also skip the
+                        # oldest live slot, which is the next one the producer will write
+                        head = tail - UNRELIABLE_CAPACITY + 1
+                    i = head & UNRELIABLE_MASK
+                    seq = self.unreliable_seq[i]
+                    send_ts = self.unreliable_send_ts[i]
+                    arrival_ts = self.unreliable_arrival_ts[i]
+                    payload = self.unreliable_payload[i]
+                    self.unreliable_head = head + 1
+                    # The slot may have been overwritten while it was being read; drop it if so
+                    if self.unreliable_tail - head >= UNRELIABLE_CAPACITY:
+                        continue
+                    self.last_recv_time = now
+                    # Count metrics only on delivery
+                    self.metrics.update_on_receive(
+                        UNRELIABLE_CHANNEL, len(payload), send_ts, arrival_ts, now)
+                    return seq, UNRELIABLE_CHANNEL, payload
                 # Return if no new arrivals (hard timeout)
                 if now - start >= hard_timeout_ms:
                     return None
+                # Block until the I/O loop buffers a packet, the hard timeout,
+                # or the point where the missing seq would be skipped
+                wait_ms = hard_timeout_ms - (now - start)
+                if self.last_recv_time:
+                    wait_ms = min(wait_ms, self.last_recv_time + RETRANSMIT_TIMEOUT_MS + 1 - now)
+                self.data_ready.wait(wait_ms / 1000.0)
+                now = now_ms()
+
+        def _advance_seq_to_recv(self):
+            # _on_datagram reads seq_to_recv without synchronisation, so a seq can be stored just
+            # after recv() skipped it. The I/O loop never stores into the slot half the seq space
+            # ahead of seq_to_recv (it counts as behind), so clearing that slot on every advance
+            # removes such a stale entry before its seq comes round again
+            seq = (self.seq_to_recv + 1) & SEQ_MASK
+            self.reliable_buffer[(seq + SEQ_SPACE // 2) & SEQ_MASK] = None
+            self.seq_to_recv = seq
+
+        def _clear_unreliable_present(self, seq):
+            # Returns whether seq was marked present
+            if self.unreliable_present[seq]:
+                self.unreliable_present[seq] = 0
+                return True
+            return False
 
         def close(self):
-            self.running_threads = False
-            self.sock.close()
-
-        def _recv_and_ack(self):
-            while self.running_threads:
-                try:
-                    data, _ = self.sock.recvfrom(65536)
-                except BlockingIOError:
-                    time.sleep(0.001)
-                    continue
-                except ConnectionResetError:
-                    # Windows-specific: ICMP port unreachable
-                    time.sleep(0.001)
-                    continue
-                try:
-                    ch, seq, ts, payload = unpack_packet(data)
-                except Exception:
-                    continue
+            _stop_io_loop(self.loop, self.io_thread, self.sock)
 
-                arrival = now_ms()
-                # print(f"seq={seq}, ch={ch} ARRIVED AT {arrival}, took {arrival-ts}ms to reach")
-                
-                # If critical packet, store in reliable buffer and send ACK
-                if ch == RELIABLE_CHANNEL:
-                    with self.reliable_data_lock:
-                        # Store payload and timing for delivery-time metrics
-                        self.reliable_buffer[seq] = (payload, ts, arrival)
-                    ack = pack_packet(RELIABLE_CHANNEL, seq, arrival, b"ACK")
-                    # print(f"seq={seq}, ch={ch} SEND ACK AT {now_ms()}")
-                    self.sock.sendto(ack, self.dest_socket_addr)
-                # Else simply push to unreliable buffer
-                else:
-                    with self.unreliable_data_lock:
-                        # Store seq, original send timestamp and arrival for delivery-time metrics
-                        self.unreliable_buffer.append((seq, ts, arrival, payload))
-                        self.unreliable_seqs.add(seq)
-                    # Do not count metrics yet; only when delivered to app in recv()
+        def _queue_ack(self, seq, now):
+            if self.pending_ack_seqs:
+                # Keep the batch within one ACK bitmap; flush early if seq is too far away
+                dist = (seq - self.pending_ack_seqs[0]) & SEQ_MASK
+                if min(dist, SEQ_SPACE - dist) >= ACK_BITMAP_BITS // 2:
+                    self._flush_acks(now)
+            if not self.pending_ack_seqs:
+                self.ack_timer = self.loop.call_later(ACK_DELAY_MS / 1000.0, self._on_ack_timer)
+            self.pending_ack_seqs.append(seq)
+            if len(self.pending_ack_seqs) >= ACK_BATCH_MAX:
+                self._flush_acks(now)
+
+        def _flush_acks(self, now):
+            # One cumulative ACK (bitmap of seqs) instead of one send per reliable packet
+            self.ack_out.append(pack_ack(self.pending_ack_seqs, now))
+            self.pending_ack_seqs = []
+            if self.ack_timer is not None:
+                self.ack_timer.cancel()
+                self.ack_timer = None
+
+        def _on_ack_timer(self):
+            # Oldest queued ACK has waited ACK_DELAY_MS
+            self.ack_timer = None
+            self._flush_acks(now_ms())
+            self._send_acks()
+
+        def _send_acks(self):
+            # Every ACK produced by one receive batch leaves in a single sendmmsg on Linux
+            self.ack_writer.send(self.ack_out)
+            self.ack_out = []
+
+        def _on_readable(self):
+            # Drain every ready datagram per wake-up (a single recvmmsg on Linux).
+            # Per-packet fixed costs are paid once per batch: one clock read for the
+            # arrival stamp and one data_ready wake-up after the whole batch is buffered
+            batch = self.reader.read()
+            if not batch:
+                return
+            arrival = now_ms()
+            on_datagram = self._on_datagram
+            for data in batch:
+                on_datagram(data, arrival)
+            self.data_ready.set()
+            if self.ack_out:
+                self._send_acks()
+
+        def _on_datagram(self, data, arrival):
+            try:
+                ch, seq, ts, payload = unpack_packet(data)
+            except Exception:
+                return
+
+            # If critical packet, store in reliable buffer and queue its ACK
+            if ch == RELIABLE_CHANNEL:
+                # Seqs behind seq_to_recv were delivered or skipped already: a retransmit whose
+                # ACK was lost. It is only ACKed again, never stored (a store racing with a skip
+                # in recv() is cleared by _advance_seq_to_recv)
+                if (seq - self.seq_to_recv) & SEQ_MASK < SEQ_SPACE // 2:
+                    # Store payload and timing for delivery-time metrics (one atomic list store)
+                    self.reliable_buffer[seq] = (seq, payload, ts, arrival)
+                self._queue_ack(seq, arrival)
+            # Else simply push to unreliable buffer
+            else:
+                # Store seq, original send timestamp and arrival for delivery-time metrics.
+                # When full this overwrites the oldest slot (stale game state is least useful);
+                # recv() notices the lap from the counters, so head stays consumer-owned
+                tail = self.unreliable_tail
+                i = tail & UNRELIABLE_MASK
+                self.unreliable_seq[i] = seq
+                self.unreliable_send_ts[i] = ts
+                self.unreliable_arrival_ts[i] = arrival
+                self.unreliable_payload[i] = payload
+                self.unreliable_present[seq] = 1
+                # Publish only after the slot is fully written
+                self.unreliable_tail = tail + 1
+                # Do not count metrics yet; only when delivered to app in recv()
@@ -14,14 +14,24 @@ Expects metrics files in metrics/ directory (as per the new format):
     - sender_jitter.json, receiver_jitter.json
 """
 
+import hashlib
 import json
+import multiprocessing
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from itertools import compress
+from operator import attrgetter
 from pathlib import Path
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import numpy as np
+
+try:
+    import orjson  # Optional: C JSON parser, several times faster than the stdlib one
+except ImportError:
+    orjson = None
+
+# zlib level 1 instead of PIL's default 6: PNG encoding is most of the save time for these
+# flat-colour charts; the files come out somewhat larger, which is fine for report artifacts
+PNG_PIL_KWARGS = {'compress_level': 1, 'optimize': False}
 
 # Fix encoding for Windows console
 if sys.platform == 'win32':
@@ -45,445 +55,369 @@ SITUATION_LABELS = {
 # Channel names
 CHANNELS = ["reliable", "unreliable"]
 
+# Tick labels shared by every bar chart
+SITUATION_TICK_LABELS = tuple(SITUATION_LABELS.get(s, s) for s in SITUATIONS)
 
-def load_metrics():
-    """Load all metrics files into a nested dictionary."""
-    metrics = {}
-    
-    for situation in SITUATIONS:
-        sender_path = f"metrics/sender_{situation}.json"
-        receiver_path = f"metrics/receiver_{situation}.json"
-        
-        if not os.path.exists(sender_path) or not os.path.exists(receiver_path):
-            print(f"[!] Warning: Missing metrics for {situation}")
-            continue
-        
-        try:
-            with open(sender_path, 'r', encoding='utf-8') as f:
-                sender_data = json.load(f)
-            with open(receiver_path, 'r', encoding='utf-8') as f:
-                receiver_data = json.load(f)
-            
-            metrics[situation] = {
-                "sender": sender_data,
-                "receiver": receiver_data
-            }
-        except json.JSONDecodeError as e:
-            print(f"[X] Error: Failed to parse JSON for {situation}. File may be corrupt.")
-            print(f"  {e}")
-        except IOError as e:
-            print(f"[X] Error: Could not read metrics file for {situation}.")
-            print(f"  {e}")
-    
-    return metrics
 
+# NumPy and Matplotlib take about a second to import (font cache included), so they are only
+# imported by load_plotting() once there are metrics to plot
+np = matplotlib = Figure = FigureCanvasAgg = FontProperties = Image = Patch = to_rgba = None
+SITUATION_X = None  # x positions shared by every bar chart
 
-def compute_pdr(metrics, situation, channel):
-    """Compute Packet Delivery Ratio for a situation and channel."""
-    try:
-        sent = metrics[situation]["sender"][channel]["sent_packets"]
-        received = metrics[situation]["receiver"][channel]["packets"]
-        return (received / sent * 100.0) if sent > 0 else 0.0
-    except (KeyError, ZeroDivisionError, TypeError):
-        return 0.0
 
+def load_plotting():
+    """Import NumPy/Matplotlib and do the one-time chart setup; a no-op after the first call."""
+    global np, matplotlib, Figure, FigureCanvasAgg, FontProperties, Image, Patch, to_rgba, SITUATION_X
+    if np is not None:
+        return
+    import numpy
+    import matplotlib as mpl
+    # Figures are drawn straight onto Agg canvases: no pyplot, so no figure manager or GUI backend
+    from matplotlib.backends.backend_agg import FigureCanvasAgg as canvas
+    from matplotlib.colors import to_rgba as rgba
+    from matplotlib.figure import Figure as figure
+    from matplotlib.font_manager import FontProperties as font
+    from matplotlib.patches import Patch as patch
+    from PIL import Image as image  # Pillow is a Matplotlib dependency
+    np, matplotlib, FigureCanvasAgg, to_rgba, Figure, FontProperties, Image, Patch = \
+        numpy, mpl, canvas, rgba, figure, font, image, patch
 
-def plot_latency_avg_p95_comparison(metrics):
-    """Generate latency comparison chart (Avg and p95)."""
-    fig, ax = plt.subplots(figsize=(12, 7))
-    
-    x = np.arange(len(SITUATIONS))
-    width = 0.2
-    
-    # Collect data
-    reliable_avg = []
-    reliable_p95 = []
-    unreliable_avg = []
-    unreliable_p95 = []
-    
-    for situation in SITUATIONS:
-        if situation not in metrics:
-            reliable_avg.append(0)
-            reliable_p95.append(0)
-            unreliable_avg.append(0)
-            unreliable_p95.append(0)
-            continue
-        
-        # NEW FORMAT: All latency metrics now come from the RECEIVER
-        try:
-            rel_avg = metrics[situation]["receiver"]["reliable"]["latency_avg_ms"]
-            rel_p95 = metrics[situation]["receiver"]["reliable"]["latency_p95_ms"]
-            unrel_avg = metrics[situation]["receiver"]["unreliable"]["latency_avg_ms"]
-            unrel_p95 = metrics[situation]["receiver"]["unreliable"]["latency_p95_ms"]
-            
-            reliable_avg.append(rel_avg if rel_avg is not None else 0)
-            reliable_p95.append(rel_p95 if rel_p95 is not None else 0)
-            unreliable_avg.append(unrel_avg if unrel_avg is not None else 0)
-            unreliable_p95.append(unrel_p95 if unrel_p95 is not None else 0)
-        except KeyError:
-            print(f"[!] Warning: Missing latency data for {situation}")
-            reliable_avg.append(0)
-            reliable_p95.append(0)
-            unreliable_avg.append(0)
-            unreliable_p95.append(0)
+    # Simple bar/scatter charts: 150 DPI is visually equivalent to 300 at a fraction of the
+    # rasterise + PNG encode cost, and fixed figsizes with tight_layout() make the extra
+    # bbox_inches='tight' measuring pass unnecessary
+    matplotlib.rcParams.update({
+        'path.simplify': True,
+        'path.simplify_threshold': 1.0,
+        'agg.path.chunksize': 10000,
+        'figure.dpi': 150,
+    })
+    SITUATION_X = np.arange(len(SITUATIONS))
+    for spec in BAR_CHART_SPECS:
+        spec.update(_bar_layout(spec))
 
-    
-    # Plot bars
-    ax.bar(x - 1.5*width, reliable_avg, width, label='Reliable Avg', color='#2E86AB', alpha=0.9)
-    ax.bar(x - 0.5*width, reliable_p95, width, label='Reliable p95', color='#2E86AB', alpha=0.5)
-    ax.bar(x + 0.5*width, unreliable_avg, width, label='Unreliable Avg', color='#A23B72', alpha=0.9)
-    ax.bar(x + 1.5*width, unreliable_p95, width, label='Unreliable p95', color='#A23B72', alpha=0.5)
-    
-    ax.set_xlabel('Network Condition', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Latency (ms)', fontsize=12, fontweight='bold')
-    ax.set_title('Latency Comparison Across Network Conditions (Avg & p95)', fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels([SITUATION_LABELS.get(s, s) for s in SITUATIONS])
-    ax.legend(loc='upper left')
-    ax.grid(axis='y', alpha=0.3)
-    ax.set_yscale('log') # Latency often varies by orders of magnitude
-    ax.set_ylabel('Latency (ms) - Log Scale', fontsize=12, fontweight='bold')
-    
-    plt.tight_layout()
-    plt.savefig('charts/latency_avg_p95_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    print("[OK] Generated: charts/latency_avg_p95_comparison.png")
 
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
 
-def plot_latency_tail_comparison(metrics):
-    """(NEW) Generate tail latency comparison chart (p99 and Max)."""
-    fig, ax = plt.subplots(figsize=(12, 7))
-    
-    x = np.arange(len(SITUATIONS))
-    width = 0.2
-    
-    # Collect data
-    reliable_p99 = []
-    reliable_max = []
-    unreliable_p99 = []
-    unreliable_max = []
-    
-    for situation in SITUATIONS:
-        if situation not in metrics:
-            reliable_p99.append(0)
-            reliable_max.append(0)
-            unreliable_p99.append(0)
-            unreliable_max.append(0)
-            continue
-        
-        try:
-            rel_p99 = metrics[situation]["receiver"]["reliable"]["latency_p99_ms"]
-            rel_max = metrics[situation]["receiver"]["reliable"]["latency_max_ms"]
-            unrel_p99 = metrics[situation]["receiver"]["unreliable"]["latency_p99_ms"]
-            unrel_max = metrics[situation]["receiver"]["unreliable"]["latency_max_ms"]
-            
-            reliable_p99.append(rel_p99 if rel_p99 is not None else 0)
-            reliable_max.append(rel_max if rel_max is not None else 0)
-            unreliable_p99.append(unrel_p99 if unrel_p99 is not None else 0)
-            unreliable_max.append(unrel_max if unrel_max is not None else 0)
-        except KeyError:
-            print(f"[!] Warning: Missing tail latency data for {situation}")
-            reliable_p99.append(0)
-            reliable_max.append(0)
-            unreliable_p99.append(0)
-            unreliable_max.append(0)
-    
-    # Plot bars
-    ax.bar(x - 1.5*width, reliable_p99, width, label='Reliable p99', color='#1E6091', alpha=0.9)
-    ax.bar(x - 0.5*width, reliable_max, width, label='Reliable Max', color='#1E6091', alpha=0.5)
-    ax.bar(x + 0.5*width, unreliable_p99, width, label='Unreliable p99', color='#720026', alpha=0.9)
-    ax.bar(x + 1.5*width, unreliable_max, width, label='Unreliable Max', color='#720026', alpha=0.5)
-    
-    ax.set_xlabel('Network Condition', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Latency (ms) - Log Scale', fontsize=12, fontweight='bold')
-    ax.set_title('Tail Latency Comparison Across Network Conditions (p99 & Max)', fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels([SITUATION_LABELS.get(s, s) for s in SITUATIONS])
-    ax.legend(loc='upper left')
-    ax.grid(axis='y', alpha=0.3)
-    ax.set_yscale('log')
-    
-    plt.tight_layout()
-    plt.savefig('charts/latency_tail_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    print("[OK] Generated: charts/latency_tail_comparison.png")
 
+def parse_json(raw):
+    """Parse JSON bytes, with orjson when it is installed (its decode errors subclass json.JSONDecodeError)."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
-def plot_jitter_comparison(metrics):
-    """(UPDATED) Generate jitter comparison chart for both channels."""
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    x = np.arange(len(SITUATIONS))
-    width = 0.35
-    
-    # Collect jitter data (from receiver)
-    reliable_jitter = []
-    unreliable_jitter = []
 
-    for situation in SITUATIONS:
-        if situation not in metrics:
-            reliable_jitter.append(0)
-            unreliable_jitter.append(0)
-            continue
-        
-        try:
-            rel_jit = metrics[situation]["receiver"]["reliable"]["jitter_ms"]
-            unrel_jit = metrics[situation]["receiver"]["unreliable"]["jitter_ms"]
-            reliable_jitter.append(rel_jit if rel_jit is not None else 0)
-            unreliable_jitter.append(unrel_jit if unrel_jit is not None else 0)
-        except KeyError:
-            print(f"[!] Warning: Missing jitter data for {situation}")
-            reliable_jitter.append(0)
-            unreliable_jitter.append(0)
-    
-    # Plot bars
-    ax.bar(x - width/2, reliable_jitter, width, label='Reliable', color='#2E86AB', alpha=0.8)
-    ax.bar(x + width/2, unreliable_jitter, width, label='Unreliable', color='#A23B72', alpha=0.8)
-    
-    ax.set_xlabel('Network Condition', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Jitter (ms)', fontsize=12, fontweight='bold')
-    ax.set_title('Jitter Comparison (RFC 3550)', fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels([SITUATION_LABELS.get(s, s) for s in SITUATIONS])
-    ax.legend()
-    ax.grid(axis='y', alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig('charts/jitter_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    print("[OK] Generated: charts/jitter_comparison.png")
+def save_png(fig, path):
+    """
+    Draw fig on its Agg canvas and encode the RGBA buffer with PIL directly: same pixels as
+    savefig(), without print_figure's renderer and facecolor/layout context switching.
+    """
+    fig.canvas.draw()
+    Image.fromarray(np.asarray(fig.canvas.buffer_rgba())).save(path, format='PNG', **PNG_PIL_KWARGS)
 
 
-def plot_throughput_comparison(metrics):
-    """(UNCHANGED) Generate throughput comparison chart."""
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    x = np.arange(len(SITUATIONS))
-    width = 0.35
-    
-    # Collect throughput data (from receiver)
-    reliable_throughput = []
-    unreliable_throughput = []
-    
-    for situation in SITUATIONS:
-        if situation not in metrics:
-            reliable_throughput.append(0)
-            unreliable_throughput.append(0)
-            continue
-        
-        try:
-            rel_thr = metrics[situation]["receiver"]["reliable"]["throughput_Bps"]
-            unrel_thr = metrics[situation]["receiver"]["unreliable"]["throughput_Bps"]
-            reliable_throughput.append(rel_thr if rel_thr is not None else 0)
-            unreliable_throughput.append(unrel_thr if unrel_thr is not None else 0)
-        except KeyError:
-            print(f"[!] Warning: Missing throughput data for {situation}")
-            reliable_throughput.append(0)
-            unreliable_throughput.append(0)
-    
-    # Plot bars
-    ax.bar(x - width/2, reliable_throughput, width, label='Reliable', color='#2E86AB', alpha=0.8)
-    ax.bar(x + width/2, unreliable_throughput, width, label='Unreliable', color='#A23B72', alpha=0.8)
-    
-    ax.set_xlabel('Network Condition', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Throughput (Bytes/sec)', fontsize=12, fontweight='bold')
-    ax.set_title('Throughput Comparison Across Network Conditions', fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels([SITUATION_LABELS.get(s, s) for s in SITUATIONS])
-    ax.legend()
-    ax.grid(axis='y', alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig('charts/throughput_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    print("[OK] Generated: charts/throughput_comparison.png")
+# Per-channel fields read by the charts, from each side's summary JSON
+RECEIVER_FIELDS = ["latency_avg_ms", "latency_p95_ms", "latency_p99_ms", "latency_max_ms",
+                   "jitter_ms", "buffer_avg_ms", "buffer_p95_ms", "throughput_Bps", "packets"]
+SENDER_FIELDS = ["sent_packets", "retransmissions"]
 
 
-def plot_buffer_comparison(metrics):
-    """(NEW) Generate buffer occupancy comparison chart (Avg & p95)."""
-    fig, ax = plt.subplots(figsize=(12, 7))
-    
-    x = np.arange(len(SITUATIONS))
-    width = 0.2
-    
-    # Collect data
-    reliable_avg = []
-    reliable_p95 = []
-    unreliable_avg = []
-    unreliable_p95 = []
-    
-    for situation in SITUATIONS:
-        if situation not in metrics:
-            reliable_avg.append(0)
-            reliable_p95.append(0)
-            unreliable_avg.append(0)
-            unreliable_p95.append(0)
-            continue
-        
-        try:
-            rel_avg = metrics[situation]["receiver"]["reliable"]["buffer_avg_ms"]
-            rel_p95 = metrics[situation]["receiver"]["reliable"]["buffer_p95_ms"]
-            unrel_avg = metrics[situation]["receiver"]["unreliable"]["buffer_avg_ms"]
-            unrel_p95 = metrics[situation]["receiver"]["unreliable"]["buffer_p95_ms"]
-            
-            reliable_avg.append(rel_avg if rel_avg is not None else 0)
-            reliable_p95.append(rel_p95 if rel_p95 is not None else 0)
-            unreliable_avg.append(unrel_avg if unrel_avg is not None else 0)
-            unreliable_p95.append(unrel_p95 if unrel_p95 is not None else 0)
-        except KeyError:
-            print(f"[!] Warning: Missing buffer data for {situation}")
-            reliable_avg.append(0)
-            reliable_p95.append(0)
-            unreliable_avg.append(0)
-            unreliable_p95.append(0)
+class ChannelMetrics:
+    """One side's summary for one channel, decoded once; fields absent or null in the JSON are None."""
+    __slots__ = ()
 
-    # Plot bars
-    ax.bar(x - 1.5*width, reliable_avg, width, label='Reliable Avg', color='#007F5F', alpha=0.9)
-    ax.bar(x - 0.5*width, reliable_p95, width, label='Reliable p95', color='#007F5F', alpha=0.5)
-    ax.bar(x + 0.5*width, unreliable_avg, width, label='Unreliable Avg', color='#E07A5F', alpha=0.9)
-    ax.bar(x + 1.5*width, unreliable_p95, width, label='Unreliable p95', color='#E07A5F', alpha=0.5)
-    
-    ax.set_xlabel('Network Condition', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Buffer (ms)', fontsize=12, fontweight='bold')
-    ax.set_title('Receiver Buffer Occupancy Comparison (Avg & p95)', fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels([SITUATION_LABELS.get(s, s) for s in SITUATIONS])
-    ax.legend(loc='upper left')
-    ax.grid(axis='y', alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig('charts/buffer_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    print("[OK] Generated: charts/buffer_comparison.png")
+    def __init__(self, data):
+        for field in self.__slots__:
+            setattr(self, field, data.get(field))
 
 
-def plot_pdr_comparison(metrics):
-    """(UNCHANGED) Generate Packet Delivery Ratio comparison chart."""
-    fig, ax = plt.subplots(figsize=(10, 6))
-    
-    x = np.arange(len(SITUATIONS))
-    width = 0.35
-    
-    # Compute PDR for each situation
-    reliable_pdr = []
-    unreliable_pdr = []
+class SenderChannelMetrics(ChannelMetrics):
+    __slots__ = SENDER_FIELDS
+
+
+class ReceiverChannelMetrics(ChannelMetrics):
+    __slots__ = RECEIVER_FIELDS
+
+
+def decode_side(raw, cls):
+    """Parse one side's metrics file into {channel: cls or None (channel missing)}."""
+    data = parse_json(raw)
+    return {channel: cls(data[channel]) if data.get(channel) is not None else None
+            for channel in CHANNELS}
+
+
+def load_metrics():
+    """
+    Load all metrics files into {situation: {side: {channel: ChannelMetrics}}}. Also returns a digest of the raw
+    files (and of this script) that identifies the charts they produce.
+    """
+    metrics = {}
+    digest = hashlib.blake2b(read_bytes(__file__))
     
+    available = []
     for situation in SITUATIONS:
-        if situation not in metrics:
-            reliable_pdr.append(0)
-            unreliable_pdr.append(0)
-            continue
+        sender_path = f"metrics/sender_{situation}.json"
+        receiver_path = f"metrics/receiver_{situation}.json"
         
-        reliable_pdr.append(compute_pdr(metrics, situation, "reliable"))
-        unreliable_pdr.append(compute_pdr(metrics, situation, "unreliable"))
-    
-    # Plot bars
-    ax.bar(x - width/2, reliable_pdr, width, label='Reliable', color='#06A77D', alpha=0.8)
-    ax.bar(x + width/2, unreliable_pdr, width, label='Unreliable', color='#D62246', alpha=0.8)
-    
-    # Add horizontal line at 100%
-    ax.axhline(y=100, color='gray', linestyle='--', alpha=0.5, linewidth=1)
+        if not os.path.exists(sender_path) or not os.path.exists(receiver_path):
+            print(f"[!] Warning: Missing metrics for {situation}")
+            continue
+        available.append((situation, sender_path, receiver_path))
+    
+    # The files are independent: read them on a thread pool so the open/read
+    # syscalls overlap, then collect results in SITUATIONS order
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        pending = [(situation, pool.submit(read_bytes, sender_path), pool.submit(read_bytes, receiver_path))
+                   for situation, sender_path, receiver_path in available]
+        for situation, sender_future, receiver_future in pending:
+            try:
+                sender_raw = sender_future.result()
+                receiver_raw = receiver_future.result()
+                metrics[situation] = {
+                    "sender": decode_side(sender_raw, SenderChannelMetrics),
+                    "receiver": decode_side(receiver_raw, ReceiverChannelMetrics)
+                }
+                for part in (situation.encode(), sender_raw, receiver_raw):
+                    digest.update(hashlib.blake2b(part).digest())
+            except json.JSONDecodeError as e:
+                print(f"[X] Error: Failed to parse JSON for {situation}. File may be corrupt.")
+                print(f"  {e}")
+            except IOError as e:
+                print(f"[X] Error: Could not read metrics file for {situation}.")
+                print(f"  {e}")
+    
+    return metrics, digest.hexdigest()
+
+
+# One reusable figure per figure size (per process): building a figure and its axes
+# is a fixed cost per chart, so later charts of the same size only clear and redraw
+_figures = {}
+
+
+def _figure(figsize):
+    """Return a cleared (fig, ax) of the given size, creating it on first use."""
+    if figsize not in _figures:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        _figures[figsize] = fig, fig.subplots()
+    fig, ax = _figures[figsize]
+    ax.clear()
+    # tight_layout() starts from the current margins, so restore the defaults a fresh figure has
+    fig.subplots_adjust(**{k: matplotlib.rcParams[f'figure.subplot.{k}']
+                           for k in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+    return fig, ax
+
+
+def collect_arrays(metrics):
+    """
+    Flatten the loaded metrics in one pass into a (len(SITUATIONS), len(CHANNELS))
+    array per field, so each chart just slices columns. Missing or null values are 0,
+    matching what the charts plot for them; "present" marks situations that were loaded.
+    """
+    shape = (len(SITUATIONS), len(CHANNELS))
+    sides = (("receiver", RECEIVER_FIELDS), ("sender", SENDER_FIELDS))
+    # One row of field values per (situation, channel), per side; each side's rows become one
+    # (situations, channels, fields) array in a single np.array call instead of an item store per value
+    rows = {side: [] for side, _ in sides}
+    getters = {side: attrgetter(*fields) for side, fields in sides}
+    for situation in SITUATIONS:
+        for side, fields in sides:
+            side_rows, get = rows[side], getters[side]
+            for channel in CHANNELS:
+                data = metrics[situation][side][channel] if situation in metrics else None
+                if data is None:
+                    if situation in metrics:
+                        print(f"[!] Warning: Missing {side} {channel} data for {situation}")
+                    side_rows.append((0,) * len(fields))
+                else:
+                    side_rows.append([value or 0 for value in get(data)])
+
+    arrays = {}
+    for side, fields in sides:
+        table = np.array(rows[side], dtype=float).reshape(shape + (len(fields),))
+        for k, field in enumerate(fields):
+            arrays[field] = table[:, :, k]
+
+    sent = arrays["sent_packets"]
+    arrays["pdr"] = np.divide(arrays["packets"], sent, out=np.zeros(shape), where=sent > 0) * 100.0
+    arrays["present"] = np.array([situation in metrics for situation in SITUATIONS])
+    return arrays
+
+
+# Grouped bar charts, one spec each. Each series is (field, channel column, label, color, alpha);
+# series are drawn side by side around every situation's x position
+BAR_CHART_SPECS = [
+    {
+        "name": "latency_avg_p95_comparison",
+        "figsize": (12, 7), "width": 0.2,
+        # Latency metrics come from the RECEIVER
+        "series": [("latency_avg_ms", 0, 'Reliable Avg', '#2E86AB', 0.9),
+                   ("latency_p95_ms", 0, 'Reliable p95', '#2E86AB', 0.5),
+                   ("latency_avg_ms", 1, 'Unreliable Avg', '#A23B72', 0.9),
+                   ("latency_p95_ms", 1, 'Unreliable p95', '#A23B72', 0.5)],
+        "ylabel": 'Latency (ms) - Log Scale',
+        "title": 'Latency Comparison Across Network Conditions (Avg & p95)',
+        "legend_loc": 'upper left',
+        "yscale": 'log',  # Latency often varies by orders of magnitude
+    },
+    {
+        "name": "latency_tail_comparison",
+        "figsize": (12, 7), "width": 0.2,
+        "series": [("latency_p99_ms", 0, 'Reliable p99', '#1E6091', 0.9),
+                   ("latency_max_ms", 0, 'Reliable Max', '#1E6091', 0.5),
+                   ("latency_p99_ms", 1, 'Unreliable p99', '#720026', 0.9),
+                   ("latency_max_ms", 1, 'Unreliable Max', '#720026', 0.5)],
+        "ylabel": 'Latency (ms) - Log Scale',
+        "title": 'Tail Latency Comparison Across Network Conditions (p99 & Max)',
+        "legend_loc": 'upper left',
+        "yscale": 'log',
+    },
+    {
+        "name": "jitter_comparison",
+        "figsize": (10, 6), "width": 0.35,
+        "series": [("jitter_ms", 0, 'Reliable', '#2E86AB', 0.8),
+                   ("jitter_ms", 1, 'Unreliable', '#A23B72', 0.8)],
+        "ylabel": 'Jitter (ms)',
+        "title": 'Jitter Comparison (RFC 3550)',
+    },
+    {
+        "name": "throughput_comparison",
+        "figsize": (10, 6), "width": 0.35,
+        "series": [("throughput_Bps", 0, 'Reliable', '#2E86AB', 0.8),
+                   ("throughput_Bps", 1, 'Unreliable', '#A23B72', 0.8)],
+        "ylabel": 'Throughput (Bytes/sec)',
+        "title": 'Throughput Comparison Across Network Conditions',
+    },
+    {
+        "name": "buffer_comparison",
+        "figsize": (12, 7), "width": 0.2,
+        "series": [("buffer_avg_ms", 0, 'Reliable Avg', '#007F5F', 0.9),
+                   ("buffer_p95_ms", 0, 'Reliable p95', '#007F5F', 0.5),
+                   ("buffer_avg_ms", 1, 'Unreliable Avg', '#E07A5F', 0.9),
+                   ("buffer_p95_ms", 1, 'Unreliable p95', '#E07A5F', 0.5)],
+        "ylabel": 'Buffer (ms)',
+        "title": 'Receiver Buffer Occupancy Comparison (Avg & p95)',
+        "legend_loc": 'upper left',
+    },
+    {
+        "name": "pdr_comparison",
+        "figsize": (10, 6), "width": 0.35,
+        "series": [("pdr", 0, 'Reliable', '#06A77D', 0.8),
+                   ("pdr", 1, 'Unreliable', '#D62246', 0.8)],
+        "ylabel": 'Packet Delivery Ratio (%)',
+        "title": 'Packet Delivery Ratio (PDR) Comparison',
+        "hline": 100,  # 100% delivery reference
+        "ylim": [0, 105],
+    },
+]
+
+
+def _bar_layout(spec):
+    """
+    Everything about a bar chart that does not depend on the metrics, worked out once in
+    load_plotting(): bar positions and RGBA colors (series alpha folded in), concatenated
+    series by series, plus the per-series legend colors and labels.
+    """
+    series = spec["series"]
+    width = spec["width"]
+    colors = np.array([to_rgba(color, alpha) for _, _, _, color, alpha in series])
+    return {
+        "positions": np.concatenate([SITUATION_X + (k - (len(series) - 1) / 2) * width
+                                     for k in range(len(series))]),
+        "colors": colors,
+        "bar_colors": np.repeat(colors, len(SITUATIONS), axis=0),
+        "labels": [label for _, _, label, _, _ in series],
+    }
+
+
+def render_bar_chart(spec, data):
+    """Draw and save one grouped bar chart described by a BAR_CHART_SPECS entry."""
+    fig, ax = _figure(spec["figsize"])
+    
+    # Plot every series with one ax.bar call; only the heights depend on the data
+    heights = np.concatenate([data[field][:, column] for field, column, _, _, _ in spec["series"]])
+    ax.bar(spec["positions"], heights, spec["width"], color=spec["bar_colors"])
+    handles = [Patch(facecolor=c, label=label) for c, label in zip(spec["colors"], spec["labels"])]
+    
+    if "hline" in spec:
+        ax.axhline(y=spec["hline"], color='gray', linestyle='--', alpha=0.5, linewidth=1)
     
     ax.set_xlabel('Network Condition', fontsize=12, fontweight='bold')
-    ax.set_ylabel('Packet Delivery Ratio (%)', fontsize=12, fontweight='bold')
-    ax.set_title('Packet Delivery Ratio (PDR) Comparison', fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels([SITUATION_LABELS.get(s, s) for s in SITUATIONS])
-    ax.set_ylim([0, 105])
-    ax.legend()
+    ax.set_ylabel(spec["ylabel"], fontsize=12, fontweight='bold')
+    ax.set_title(spec["title"], fontsize=14, fontweight='bold')
+    ax.set_xticks(SITUATION_X)
+    ax.set_xticklabels(SITUATION_TICK_LABELS)
+    if "ylim" in spec:
+        ax.set_ylim(spec["ylim"])
+    ax.legend(handles=handles, loc=spec.get("legend_loc", 'best'))
     ax.grid(axis='y', alpha=0.3)
+    if "yscale" in spec:
+        ax.set_yscale(spec["yscale"])
     
-    plt.tight_layout()
-    plt.savefig('charts/pdr_comparison.png', dpi=300, bbox_inches='tight')
-    plt.close()
-    print("[OK] Generated: charts/pdr_comparison.png")
+    path = f'charts/{spec["name"]}.png'
+    fig.tight_layout()
+    save_png(fig, path)
+    print(f"[OK] Generated: {path}")
 
 
-def plot_retransmissions(metrics):
+def plot_retransmissions(data):
     """(UNCHANGED) Generate retransmissions chart (reliable channel only)."""
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _figure((10, 6))
     
-    x = np.arange(len(SITUATIONS))
     width = 0.5
     
-    # Collect retransmission data
-    retransmissions = []
-    
-    for situation in SITUATIONS:
-        if situation not in metrics:
-            retransmissions.append(0)
-            continue
-        
-        try:
-            retrans = metrics[situation]["sender"]["reliable"]["retransmissions"]
-            retransmissions.append(retrans if retrans is not None else 0)
-        except KeyError:
-            print(f"[!] Warning: Missing retransmission data for {situation}")
-            retransmissions.append(0)
-            
+    # Retransmissions happen on the reliable channel only
+    retransmissions = data["retransmissions"][:, 0]
+
     # Plot bars
-    bars = ax.bar(x, retransmissions, width, color='#C73E1D', alpha=0.8)
+    bars = ax.bar(SITUATION_X, retransmissions, width, color='#C73E1D', alpha=0.8)
     
-    # Add value labels on bars
+    # Add value labels on bars, all sharing one FontProperties
+    label_font = FontProperties(weight='bold')
     for bar in bars:
         height = bar.get_height()
         ax.text(bar.get_x() + bar.get_width()/2., height,
                 f'{int(height)}',
-                ha='center', va='bottom', fontweight='bold')
+                ha='center', va='bottom', fontproperties=label_font)
     
     ax.set_xlabel('Network Condition', fontsize=12, fontweight='bold')
     ax.set_ylabel('Retransmission Count', fontsize=12, fontweight='bold')
     ax.set_title('Retransmissions (Reliable Channel)', fontsize=14, fontweight='bold')
-    ax.set_xticks(x)
-    ax.set_xticklabels([SITUATION_LABELS.get(s, s) for s in SITUATIONS])
+    ax.set_xticks(SITUATION_X)
+    ax.set_xticklabels(SITUATION_TICK_LABELS)
     ax.grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig('charts/retransmissions.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.tight_layout()
+    save_png(fig, 'charts/retransmissions.png')
     print("[OK] Generated: charts/retransmissions.png")
 
 
-def plot_reliability_latency_tradeoff(metrics):
+# Scatter style per channel column: (legend label, color, marker)
+TRADEOFF_SERIES = (('Reliable', '#2E86AB', 'o'), ('Unreliable', '#A23B72', 's'))
+
+
+def plot_reliability_latency_tradeoff(data):
     """(UPDATED) Generate reliability vs latency trade-off scatter plot."""
-    fig, ax = plt.subplots(figsize=(10, 8))
-    
-    # Collect data for both channels
-    for channel, color, marker in [("reliable", '#2E86AB', 'o'), ("unreliable", '#A23B72', 's')]:
-        latencies = []
-        pdrs = []
-        labels = []
-        
-        for situation in SITUATIONS:
-            if situation not in metrics:
-                continue
-            
-            try:
-                # Get latency (avg) - UPDATED from p50 and sender-based
-                lat = metrics[situation]["receiver"][channel]["latency_avg_ms"]
-                
-                if lat is None or lat == 0:
-                    continue
-                
-                # Get PDR
-                pdr = compute_pdr(metrics, situation, channel)
-                
-                latencies.append(lat)
-                pdrs.append(pdr)
-                labels.append(SITUATION_LABELS.get(situation, situation))
-            except KeyError:
-                print(f"[!] Warning: Missing data for {situation} in trade-off plot")
-                continue
+    fig, ax = _figure((10, 8))
+    
+    label_font = FontProperties(size=9)  # Shared by every point label
+    # Plot both channels
+    for j, (label, color, marker) in enumerate(TRADEOFF_SERIES):
+        # Latency avg (receiver-based); situations without latency are left out
+        lat = data["latency_avg_ms"][:, j]
+        keep = data["present"] & (lat != 0)
+        latencies = lat[keep]
+        pdrs = data["pdr"][keep, j]
+        labels = list(compress(SITUATION_TICK_LABELS, keep))
         
         # Plot scatter
         ax.scatter(latencies, pdrs, s=200, alpha=0.7, color=color, 
-                  marker=marker, label=channel.capitalize(), edgecolors='black', linewidth=1.5)
+                  marker=marker, label=label, edgecolors='black', linewidth=1.5)
         
         # Add labels
-        for i, label in enumerate(labels):
-            ax.annotate(label, (latencies[i], pdrs[i]), 
+        for i, situation_label in enumerate(labels):
+            ax.annotate(situation_label, (latencies[i], pdrs[i]), 
                        xytext=(8, 8), textcoords='offset points',
-                       fontsize=9, alpha=0.8)
+                       fontproperties=label_font, alpha=0.8)
     
     ax.set_xlabel('Latency Avg (ms)', fontsize=12, fontweight='bold')
     ax.set_ylabel('Packet Delivery Ratio (%)', fontsize=12, fontweight='bold')
@@ -492,63 +426,127 @@ def plot_reliability_latency_tradeoff(metrics):
     ax.grid(True, alpha=0.3)
     ax.set_ylim([0, 105])
     
-    plt.tight_layout()
-    plt.savefig('charts/reliability_latency_tradeoff.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.tight_layout()
+    save_png(fig, 'charts/reliability_latency_tradeoff.png')
     print("[OK] Generated: charts/reliability_latency_tradeoff.png")
 
 
-def generate_summary_table(metrics):
-    """(UPDATED) Generate and print a summary table of all metrics."""
-    print("\n" + "="*132)
-    print("METRICS SUMMARY TABLE")
-    print("="*132)
-    
-    header = f"{'Situation':<12} {'Channel':<10} {'Sent':<8} {'Recv':<8} {'PDR%':<8} " \
-             f"{'Avg(ms)':<10} {'p95(ms)':<10} {'Jitter':<10} {'BufAvg(ms)':<11} {'Thr(B/s)':<12} {'Retrans':<8}"
-    print(header)
-    print("-"*132)
-    
-    for situation in SITUATIONS:
+# Every chart, in output order; each is independent, so they can render in parallel.
+# Entries are bar chart specs or plot functions for the charts that need custom drawing
+CHARTS = BAR_CHART_SPECS + [
+    plot_retransmissions,
+    plot_reliability_latency_tradeoff,
+]
+
+# Per chart: the inputs digest (see load_metrics) it was last rendered from and a digest
+# of the PNG written; a chart is only re-rendered if either no longer matches
+CHART_MANIFEST = Path("charts/.charts_manifest.json")
+
+_worker_data = None
+
+
+def _init_worker(data):
+    """Receive the chart arrays once per worker process instead of once per chart."""
+    global _worker_data
+    load_plotting()  # Already done in a forked worker; spawned workers start from a fresh import
+    _worker_data = data
+
+
+def _render(chart):
+    render_chart(chart, _worker_data)
+
+
+def render_chart(chart, data):
+    if callable(chart):
+        chart(data)
+    else:
+        render_bar_chart(chart, data)
+
+
+def chart_name(chart):
+    return chart["name"] if isinstance(chart, dict) else chart.__name__[len("plot_"):]
+
+
+def file_digest(path):
+    try:
+        return hashlib.blake2b(read_bytes(path)).hexdigest()
+    except OSError:
+        return None
+
+
+def load_manifest():
+    try:
+        return parse_json(read_bytes(CHART_MANIFEST))
+    except (OSError, ValueError):
+        return {}
+
+
+def render_all_charts(data, digest):
+    """
+    Render every chart whose inputs changed, one per worker process (Agg rasterisation +
+    PNG encoding are CPU-bound), then record their digest in CHART_MANIFEST.
+    """
+    manifest = load_manifest()
+    charts = []
+    for chart in CHARTS:
+        name = chart_name(chart)
+        if manifest.get(name) == [digest, file_digest(f"charts/{name}.png")]:
+            print(f"[OK] Up to date: charts/{name}.png")
+        else:
+            charts.append(chart)
+
+    processes = min(len(charts), os.cpu_count() or 1)
+    if processes < 2:
+        for chart in charts:
+            render_chart(chart, data)
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(data,)) as pool:
+            pool.map(_render, charts, chunksize=1)
+
+    for chart in charts:
+        name = chart_name(chart)
+        manifest[name] = [digest, file_digest(f"charts/{name}.png")]
+    CHART_MANIFEST.write_text(json.dumps(manifest, indent=2))
+
+
+# Summary table columns: (header, width); rows and header share one precompiled format
+SUMMARY_COLUMNS = [('Situation', 12), ('Channel', 10), ('Sent', 8), ('Recv', 8), ('PDR%', 8),
+                   ('Avg(ms)', 10), ('p95(ms)', 10), ('Jitter', 10), ('BufAvg(ms)', 11),
+                   ('Thr(B/s)', 12), ('Retrans', 8)]
+SUMMARY_ROW = " ".join(f"{{:<{width}}}" for _, width in SUMMARY_COLUMNS)
+
+
+def _cell(value, spec=''):
+    return format(value, spec) if value is not None else "N/A"
+
+
+def generate_summary_table(metrics, arrays):
+    """(UPDATED) Generate and print a summary table of all metrics (PDR from collect_arrays)."""
+    lines = ["", "="*132, "METRICS SUMMARY TABLE", "="*132,
+             SUMMARY_ROW.format(*(title for title, _ in SUMMARY_COLUMNS)), "-"*132]
+    
+    for i, situation in enumerate(SITUATIONS):
         if situation not in metrics:
             continue
         
-        for channel in CHANNELS:
-            try:
-                sender = metrics[situation]["sender"][channel]
-                receiver = metrics[situation]["receiver"][channel]
-                
-                sent = sender.get("sent_packets")
-                recv = receiver.get("packets")
-                pdr = compute_pdr(metrics, situation, channel)
-                
-                # UPDATED: All latency from receiver, use Avg instead of p50
-                avg = receiver.get("latency_avg_ms")
-                p95 = receiver.get("latency_p95_ms")
-                
-                jitter = receiver.get("jitter_ms")
-                buf_avg = receiver.get("buffer_avg_ms") # NEWLY ADDED
-                throughput = receiver.get("throughput_Bps")
-                retrans = sender.get("retransmissions")
-                
-                # Format values
-                sent_str = f"{sent}" if sent is not None else "N/A"
-                recv_str = f"{recv}" if recv is not None else "N/A"
-                retrans_str = f"{retrans}" if retrans is not None else "N/A"
-                avg_str = f"{avg:.2f}" if avg is not None else "N/A"
-                p95_str = f"{p95:.2f}" if p95 is not None else "N/A"
-                jitter_str = f"{jitter:.3f}" if jitter is not None else "N/A"
-                buf_avg_str = f"{buf_avg:.2f}" if buf_avg is not None else "N/A"
-                thr_str = f"{throughput:.1f}" if throughput is not None else "N/A"
-                
-                row = f"{SITUATION_LABELS.get(situation, situation):<12} {channel:<10} {sent_str:<8} {recv_str:<8} " \
-                      f"{pdr:<8.2f} {avg_str:<10} {p95_str:<10} {jitter_str:<10} {buf_avg_str:<11} " \
-                      f"{thr_str:<12} {retrans_str:<8}"
-                print(row)
-            except KeyError as e:
-                print(f"[!] Warning: Missing key {e} for {situation}/{channel} in summary table")
+        for j, channel in enumerate(CHANNELS):
+            sender = metrics[situation]["sender"][channel]
+            receiver = metrics[situation]["receiver"][channel]
+            if sender is None or receiver is None:
+                lines.append(f"[!] Warning: Missing key '{channel}' for {situation}/{channel} in summary table")
+                continue
+            
+            # UPDATED: All latency from receiver, use Avg instead of p50
+            lines.append(SUMMARY_ROW.format(
+                SITUATION_LABELS.get(situation, situation), channel,
+                _cell(sender.sent_packets), _cell(receiver.packets),
+                format(arrays["pdr"][i, j], '.2f'),
+                _cell(receiver.latency_avg_ms, '.2f'), _cell(receiver.latency_p95_ms, '.2f'),
+                _cell(receiver.jitter_ms, '.3f'), _cell(receiver.buffer_avg_ms, '.2f'),
+                _cell(receiver.throughput_Bps, '.1f'), _cell(sender.retransmissions)))
     
-    print("="*132 + "\n")
+    lines.append("="*132 + "\n")
+    print("\n".join(lines))
 
 
 def main():
@@ -562,7 +560,7 @@ def main():
     
     # Load metrics
     print("Loading metrics from metrics/ directory...")
-    metrics = load_metrics()
+    metrics, digest = load_metrics()
     
     if not metrics:
         print("[X] Error: No metrics files found in metrics/ directory")
@@ -571,23 +569,18 @@ def main():
         return
     
     print(f"[OK] Loaded metrics for {len(metrics)} situation(s)\n")
+    load_plotting()
     
     # Generate all charts
     print("Generating charts...")
     try:
-        plot_latency_avg_p95_comparison(metrics)
-        plot_latency_tail_comparison(metrics) # NEW
-        plot_jitter_comparison(metrics)
-        plot_throughput_comparison(metrics)
-        plot_buffer_comparison(metrics) # NEW
-        plot_pdr_comparison(metrics)
-        plot_retransmissions(metrics)
-        plot_reliability_latency_tradeoff(metrics)
+        arrays = collect_arrays(metrics)
+        render_all_charts(arrays, digest)
         
         print("\n[OK] All charts generated successfully in charts/ directory")
         
         # Print summary table
-        generate_summary_table(metrics)
+        generate_summary_table(metrics, arrays)
         
         print("Next steps:")
         print("1. Review charts in the charts/ directory")
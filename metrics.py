@@ -1,81 +1,128 @@
-from utils import now_ms
+import json
+from array import array
+from collections import Counter
+from operator import add
 
+try:
+    import orjson  # Optional: C JSON encoder, used for the summary files when installed
+except ImportError:
+    orjson = None
 
 RELIABLE, UNRELIABLE = 0, 1
 
-
-def _pct(values, q):
-    if not values:
-        return 0.0
-    s = sorted(values)
-    n = len(s)
-    if q == 50:
-        m = n//2
-        return round(s[m] if n % 2 else (s[m-1]+s[m])/2, 2)
-    idx = max(0, int((q/100.0) * (n-1)))
-    return round(s[idx], 2)
-
-
-def _min(values):
-    return float(min(values)) if values else 0.0
-
-
-def _max(values):
-    return float(max(values)) if values else 0.0
-
-
-def _avg(values):
-    return round(sum(values) / len(values), 2) if values else 0.0
+# Receiver samples are kept raw for this many packets per channel, then folded into
+# {whole ms: count} histograms, so memory stays bounded however long a session runs while
+# every summary statistic remains exact
+SAMPLE_CHUNK = 1 << 14
+
+
+def _hist_stats(hist):
+    """
+    (min, avg, p95, p99, max) of a {sample: count} histogram, exact over the samples: the mean is
+    rounded to 2 dp and pq is the sample at sorted index int(q/100 * (n-1)).
+    """
+    n = sum(hist.values())
+    if not n:
+        return 0.0, 0.0, 0.0, 0.0, 0.0
+    keys = sorted(hist)
+    # Walk the cumulative counts once to find the sample at each percentile rank
+    ranks = [int(0.95 * (n - 1)), int(0.99 * (n - 1))]
+    pcts = []
+    seen = 0
+    for k in keys:
+        seen += hist[k]
+        while ranks and ranks[0] < seen:
+            pcts.append(k)
+            ranks.pop(0)
+        if not ranks:
+            break
+    total = sum(k * c for k, c in hist.items())
+    return float(keys[0]), round(total / n, 2), round(pcts[0], 2), round(pcts[1], 2), float(keys[-1])
+
+
+def _jitter(latencies, jitter=0.0, last=None):
+    # Successive latency differences smoothed with gain 1/16, referenced from RFC 3550.
+    # Returns (jitter, last sample) so the EWMA can continue over the next chunk
+    if last is None:
+        if not latencies:
+            return jitter, last
+        # Seed with the first sample so the loop needs no branch; that step adds (0 - 0.0) / 16
+        last = latencies[0]
+    for t in latencies:
+        jitter += (abs(t - last) - jitter) / 16.0
+        last = t
+    return jitter, last
 
 
 class ReceiverMetrics:
     def __init__(self):
         self.start_time_ms = self.end_time_ms = None
-        self._stats = {ch: {"packets": 0, "bytes": 0, "latencies": [], "jitter": 0.0, "_last": None, "buffer_latencies": []}
-                       for ch in (RELIABLE, UNRELIABLE)}
+        # Struct of arrays indexed by channel (RELIABLE=0, UNRELIABLE=1). Per-packet samples are whole ms;
+        # array('q') stores them unboxed (8 bytes each, no int object per packet) until the chunk is folded
+        self.bytes = [0, 0]
+        self.latencies = [array('q'), array('q')]
+        self.buffer_latencies = [array('q'), array('q')]
+        # State of the samples folded so far (see _fold)
+        self.folded_packets = [0, 0]
+        self.latency_hist = [Counter(), Counter()]  # latency + buffer time
+        self.buffer_hist = [Counter(), Counter()]
+        self.jitter = [0.0, 0.0]
+        self.last_latency = [None, None]
 
     def start(self, now_ms): self.start_time_ms = now_ms
     def stop(self, now_ms): self.end_time_ms = now_ms
 
-    def update_on_receive(self, channel, payload_len, send_ts_ms, arrival_ms):
-        now = now_ms()
-        st = self._stats[channel]
-        st["packets"] += 1
-        st["bytes"] += payload_len
-        # Record latency/jitter for both channels on receiver side
-        t = arrival_ms - send_ts_ms
-        st["latencies"].append(t)
-        if st["_last"] is not None:
-            d = abs(t - st["_last"])
-            # 1/16 smooths out jitter measurements, referenced from RFC 3550
-            st["jitter"] += (d - st["jitter"]) / 16.0 
-        st["_last"] = t
-        buffer_t = now - arrival_ms
-        st["buffer_latencies"].append(buffer_t)
+    def update_on_receive(self, channel, payload_len, send_ts_ms, arrival_ms, delivered_ms):
+        self.bytes[channel] += payload_len
+        # Record latency for both channels on receiver side; jitter is derived from it when folded
+        latencies = self.latencies[channel]
+        latencies.append(arrival_ms - send_ts_ms)
+        # delivered_ms is the caller's cached clock and may predate a just-arrived packet
+        self.buffer_latencies[channel].append(max(0, delivered_ms - arrival_ms))
+        if len(latencies) == SAMPLE_CHUNK:
+            self._fold(channel)
+
+    def _fold(self, ch):
+        # Move the raw chunk into the histograms (Counter.update counts in C) and advance the jitter EWMA
+        l = self.latencies[ch]
+        buffer_l = self.buffer_latencies[ch]
+        self.latency_hist[ch].update(map(add, l, buffer_l))
+        self.buffer_hist[ch].update(buffer_l)
+        self.jitter[ch], self.last_latency[ch] = _jitter(l, self.jitter[ch], self.last_latency[ch])
+        self.folded_packets[ch] += len(l)
+        del l[:]
+        del buffer_l[:]
 
     def summary(self):
         dur = (max(0, (self.end_time_ms - self.start_time_ms)) / 1000.0) if (
             self.start_time_ms is not None and self.end_time_ms is not None) else 0.0
         out = {}
-        for ch, st in self._stats.items():
-            l = st["latencies"]
-            buffer_l = st["buffer_latencies"]
-            combined_l = [a + b for a, b in zip(l, buffer_l)]
+        for ch in (RELIABLE, UNRELIABLE):
+            # Folded histograms plus the current chunk, without disturbing the recorder's state
+            l = self.latencies[ch]
+            buffer_l = self.buffer_latencies[ch]
+            latency_hist = self.latency_hist[ch].copy()
+            latency_hist.update(map(add, l, buffer_l))
+            buffer_hist = self.buffer_hist[ch].copy()
+            buffer_hist.update(buffer_l)
+            jitter, _ = _jitter(l, self.jitter[ch], self.last_latency[ch])
+            lat_min, lat_avg, lat_p95, lat_p99, lat_max = _hist_stats(latency_hist)
+            buf_min, buf_avg, buf_p95, buf_p99, buf_max = _hist_stats(buffer_hist)
             name = "reliable" if ch == RELIABLE else "unreliable"
             out[name] = {
-                "packets": st["packets"], "bytes": st["bytes"],
-                "latency_min_ms": _min(combined_l),
-                "latency_avg_ms": _avg(combined_l),
-                "latency_p95_ms": _pct(combined_l, 95),
-                "latency_p99_ms": _pct(combined_l, 99),
-                "latency_max_ms": _max(combined_l),
-                "jitter_ms": round(st["jitter"], 2),
-                "throughput_Bps": round(float(st["bytes"]/dur if dur > 0 else 0.0), 2),
-                "buffer_min_ms": _min(buffer_l),
-                "buffer_avg_ms": _avg(buffer_l),
-                "buffer_p95_ms": _pct(buffer_l, 95),
-                "buffer_p99_ms": _pct(buffer_l, 99),
-                "buffer_max_ms": _max(buffer_l),
+                "packets": self.folded_packets[ch] + len(l), "bytes": self.bytes[ch],
+                "latency_min_ms": lat_min,
+                "latency_avg_ms": lat_avg,
+                "latency_p95_ms": lat_p95,
+                "latency_p99_ms": lat_p99,
+                "latency_max_ms": lat_max,
+                "jitter_ms": round(jitter, 2),
+                "throughput_Bps": round(self.bytes[ch] / dur if dur > 0 else 0.0, 2),
+                "buffer_min_ms": buf_min,
+                "buffer_avg_ms": buf_avg,
+                "buffer_p95_ms": buf_p95,
+                "buffer_p99_ms": buf_p99,
+                "buffer_max_ms": buf_max,
                 
                 }
         return out
@@ -83,16 +130,21 @@ class ReceiverMetrics:
 
 class SenderMetrics:
     def __init__(self):
-        self._stats = {ch: {"sent_packets": 0, "sent_bytes": 0, "retransmissions": 0, "reliable_latencies": [], "jitter": 0.0, "_last": None}
-                       for ch in (RELIABLE, UNRELIABLE)}
+        # Per-channel counters indexed by channel (RELIABLE=0, UNRELIABLE=1), as in ReceiverMetrics
+        self.sent_packets = [0, 0]
+        self.sent_bytes = [0, 0]
+        self.retransmissions = [0, 0]
+        # Sender-side reliable latency estimate (unused, see summary())
+        self.reliable_latencies = []
+        self.reliable_jitter = 0.0
+        self._last_reliable_latency = None
 
     def update_on_send(self, channel, total_len):
-        st = self._stats[channel]
-        st["sent_packets"] += 1
-        st["sent_bytes"] += total_len
+        self.sent_packets[channel] += 1
+        self.sent_bytes[channel] += total_len
 
     def update_on_retransmit(
-        self, channel): self._stats[channel]["retransmissions"] += 1
+        self, channel): self.retransmissions[channel] += 1
 
     def update_on_ack(
             self, rtt_ms):
@@ -101,14 +153,13 @@ class SenderMetrics:
 
     def update_on_reliable_latency(self, latency_ms: float):
         # Record reliable one-way latency estimate (computed at sender as (ACK_time - first_send)/2)
-        st = self._stats[RELIABLE]
         latency = float(latency_ms)
-        st["reliable_latencies"].append(latency)
+        self.reliable_latencies.append(latency)
         # Calculate jitter for reliable channel
-        if st["_last"] is not None:
-            d = abs(latency - st["_last"])
-            st["jitter"] += (d - st["jitter"]) / 16.0
-        st["_last"] = latency
+        if self._last_reliable_latency is not None:
+            d = abs(latency - self._last_reliable_latency)
+            self.reliable_jitter += (d - self.reliable_jitter) / 16.0
+        self._last_reliable_latency = latency
 
     # Dropped packet counting removed from metrics (no-op kept for compatibility)
     def update_on_drop(self):
@@ -116,13 +167,13 @@ class SenderMetrics:
 
     def summary(self):
         out = {}
-        for ch, st in self._stats.items():
+        for ch in (RELIABLE, UNRELIABLE):
             name = "reliable" if ch == RELIABLE else "unreliable"
-            o = st.get("reliable_latencies", [])
+            o = self.reliable_latencies
             out[name] = {
-                "sent_packets": st["sent_packets"],
-                "sent_bytes": st["sent_bytes"],
-                "retransmissions": st["retransmissions"],
+                "sent_packets": self.sent_packets[ch],
+                "sent_bytes": self.sent_bytes[ch],
+                "retransmissions": self.retransmissions[ch],
                 ### Latency/jitter metrics below calculated at receiver side instead of sender.
                 ### Refer to note under GameNetAPI.Sender._recv_ack for explanation.
                 # Reliable one-way latency (sender-estimated) as min/avg/p95/p99/max; NA for unreliable
@@ -132,11 +183,32 @@ class SenderMetrics:
                 # "latency_p99_ms": _pct(o, 99) if ch == RELIABLE else None,
                 # "latency_max_ms": _max(o) if ch == RELIABLE else None,
                 # Jitter for reliable channel (sender side); NA for unreliable
-                # "jitter_ms": float(st["jitter"]) if ch == RELIABLE else None,
+                # "jitter_ms": self.reliable_jitter if ch == RELIABLE else None,
             }
         return out
 
 
+# Float columns of a receiver summary row after packets/bytes: (key, width, format spec, default if absent).
+# The row template is built once; each float cell is pre-formatted (or "NA") and right-aligned by it
+_RECEIVER_FLOAT_COLUMNS = (
+    ('latency_min_ms', 9, '.2f', None), ('latency_avg_ms', 9, '.2f', None), ('latency_p95_ms', 9, '.2f', None),
+    ('latency_p99_ms', 9, '.2f', None), ('latency_max_ms', 9, '.2f', None), ('jitter_ms', 11, '.2f', None),
+    ('throughput_Bps', 10, '.2f', 0.0), ('buffer_avg_ms', 9, '.2f', None),
+)
+_RECEIVER_ROW = "  {:<11}{:>14}{:>10}" + "".join(f"{{:>{width}}}" for _, width, _, _ in _RECEIVER_FLOAT_COLUMNS)
+_SENDER_ROW = "  {:<11}{:>16}{:>15}{:>13}"
+
+
+def write_summary_json(summary: dict, path: str):
+    """Write a summary as 2-space indented JSON, encoded in one go and written as bytes."""
+    if orjson is not None:
+        data = orjson.dumps(summary, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(summary, indent=2).encode()
+    with open(path, "wb") as f:
+        f.write(data)
+
+
 def format_receiver_summary(summary: dict) -> str:
     hdr = (
         "[RECEIVER] Metrics summary:\n"
@@ -144,19 +216,12 @@ def format_receiver_summary(summary: dict) -> str:
         "  min(ms)  avg(ms)  p95(ms)  p99(ms)  max(ms)  jitter(ms)  thr(B/s)  buffer_avg(ms)"
     )
 
-    def fmt_float(v, width, prec):
-        if v is None:
-            return f"{'NA':>{width}}"
-        return f"{float(v):>{width}.{prec}f}"
-
     def row(name, s):
-        return (f"  {name:<11}{int(s.get('packets',0)):>14}{int(s.get('bytes',0)):>10}"
-                f"{fmt_float(s.get('latency_min_ms'),9,2)}{fmt_float(s.get('latency_avg_ms'),9,2)}"
-                f"{fmt_float(s.get('latency_p95_ms'),9,2)}{fmt_float(s.get('latency_p99_ms'),9,2)}"
-                f"{fmt_float(s.get('latency_max_ms'),9,2)}"
-                f"{fmt_float(s.get('jitter_ms'),11,2)}{fmt_float(s.get('throughput_Bps',0.0),10,2)}"
-                f"{fmt_float(s.get('buffer_avg_ms'),9,2)}"
-                )
+        cells = []
+        for key, _, spec, default in _RECEIVER_FLOAT_COLUMNS:
+            v = s.get(key, default)
+            cells.append("NA" if v is None else format(float(v), spec))
+        return _RECEIVER_ROW.format(name, int(s.get('packets', 0)), int(s.get('bytes', 0)), *cells)
     return "\n".join([hdr, row("reliable", summary.get("reliable", {})), row("unreliable", summary.get("unreliable", {}))])
 
 
@@ -168,11 +233,6 @@ def format_sender_summary(summary: dict) -> str:
     )
 
     def row(name, s):
-        return (f"  {name:<11}{int(s.get('sent_packets',0)):>16}{int(s.get('sent_bytes',0)):>15}"
-                f"{int(s.get('retransmissions',0)):>13}"
-                # f"{fmt_float(s.get('latency_min_ms'),9,2)}"
-                # f"{fmt_float(s.get('latency_avg_ms'),9,2)}{fmt_float(s.get('latency_p95_ms'),9,2)}"
-                # f"{fmt_float(s.get('latency_p99_ms'),9,2)}{fmt_float(s.get('latency_max_ms'),9,2)}"
-                # f"{fmt_float(s.get('jitter_ms'),11,3)}"
-                )
+        return _SENDER_ROW.format(name, int(s.get('sent_packets', 0)), int(s.get('sent_bytes', 0)),
+                                  int(s.get('retransmissions', 0)))
     return "\n".join([hdr, row("reliable", summary.get("reliable", {})), row("unreliable", summary.get("unreliable", {}))])
@@ -1,11 +1,15 @@
 import time
 import argparse
 import json
+import logging
 import os
 from emulator import EMULATOR_PROXY, RECEIVER_ADDR, SENDER_ADDR
 from gameNetAPI import GameNetAPI
-from utils import now_ms, RELIABLE_CHANNEL
-from metrics import format_receiver_summary
+from utils import now_ms, start_stdout_logging, RELIABLE_CHANNEL
+from metrics import format_receiver_summary, write_summary_json
+
+# Per-packet logs are DEBUG; --quiet raises the level so they are never formatted
+log = logging.getLogger("receiver")
 
 
 if __name__ == '__main__':
@@ -18,35 +22,41 @@ if __name__ == '__main__':
                         help="Optional path to write receiver metrics JSON summary")
     parser.add_argument("--pdr-from", type=str, default="",
                         help="Optional path to sender metrics JSON to compute PDR")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Hide per-packet delivery and skip logs")
     args = parser.parse_args()
+    log_listener = start_stdout_logging()
+    level = logging.INFO if args.quiet else logging.DEBUG
+    logging.getLogger("gameNetAPI").setLevel(level)
+    log.setLevel(level)
+    debug = log.isEnabledFor(logging.DEBUG)
 
     # Main receiver logic
     print("[RECEIVER] listening...")
     dest = SENDER_ADDR if args.direct else EMULATOR_PROXY
     receiver = GameNetAPI(is_sender=False, src_socket_addr=RECEIVER_ADDR, dest_socket_addr=dest)
-    recv = []
-    start = time.time()
+    end = time.monotonic() + args.duration
 
     try:
-        while time.time() - start < args.duration:
+        while time.monotonic() < end:
             msg = receiver.recv(hard_timeout_ms = 1000)
             if msg:
-                seq, ch, data = msg
-                print(
-                    f"[RECEIVER] got seq={seq} ch={'REL' if ch==RELIABLE_CHANNEL else 'UNREL'} data={data}")
-                recv.append((seq, ch))
+                if debug:
+                    seq, ch, data = msg
+                    log.debug("[RECEIVER] got seq=%d ch=%s data=%s",
+                              seq, 'REL' if ch == RELIABLE_CHANNEL else 'UNREL', data)
     except KeyboardInterrupt:
         pass
     finally:
         receiver.metrics.stop(now_ms())
         recv_summary = receiver.metrics.summary()
+        log_listener.stop()
         print(format_receiver_summary(recv_summary))
 
         # Optional JSON export
         if args.metrics_json:
             try:
-                with open(args.metrics_json, "w") as f:
-                    json.dump(recv_summary, f, indent=2)
+                write_summary_json(recv_summary, args.metrics_json)
                 print(f"[RECEIVER] Wrote metrics JSON to {args.metrics_json}")
             except Exception as e:
                 print(f"[RECEIVER] Failed to write metrics JSON: {e}")
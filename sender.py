@@ -1,10 +1,15 @@
 import time
 import argparse
-import json
+import itertools
+import logging
 import random
 from emulator import EMULATOR_PROXY, SENDER_ADDR, RECEIVER_ADDR
 from gameNetAPI import GameNetAPI
-from metrics import format_sender_summary
+from metrics import format_sender_summary, write_summary_json
+from utils import start_stdout_logging
+
+# Per-packet logs are DEBUG; --quiet raises the level so they are never formatted
+log = logging.getLogger("sender")
 
 
 GAME_MESSAGES = {
@@ -31,39 +36,55 @@ if __name__ == '__main__':
                         help="Packets per second (avg)")
     parser.add_argument("--metrics-json", type=str, default="",
                         help="Optional path to write sender metrics JSON summary")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Hide per-packet send and retransmit logs")
     args = parser.parse_args()
+    log_listener = start_stdout_logging()
+    level = logging.INFO if args.quiet else logging.DEBUG
+    logging.getLogger("gameNetAPI").setLevel(level)
+    log.setLevel(level)
+    debug = log.isEnabledFor(logging.DEBUG)
 
     dest = RECEIVER_ADDR if args.direct else EMULATOR_PROXY
     sender = GameNetAPI(is_sender=True, src_socket_addr=SENDER_ADDR, dest_socket_addr=dest)
-    start = time.time()
 
     # Alternate between reliable and unreliable for simplicity
     next_rel = True
+    # Each channel cycles through its game messages, shuffled once per run
+    rel_messages = itertools.cycle(random.sample(GAME_MESSAGES["reliable"], len(GAME_MESSAGES["reliable"])))
+    unrel_messages = itertools.cycle(random.sample(GAME_MESSAGES["unreliable"], len(GAME_MESSAGES["unreliable"])))
 
     try:
         interval = 1.0 / max(0.1, args.rate)
-        while time.time() - start < args.duration:
+        # Sends are paced against absolute monotonic deadlines, so time spent in send() and
+        # logging is absorbed by the next sleep instead of slowing the rate
+        next_send = time.monotonic()
+        end = next_send + args.duration
+        while next_send < end:
             is_reliable = next_rel
             next_rel = not next_rel
 
-            # Choose a random game message based on channel type
-            msg_type = "reliable" if is_reliable else "unreliable"
-            msg = random.choice(GAME_MESSAGES[msg_type])
+            # Next game message for this channel type
+            msg = next(rel_messages if is_reliable else unrel_messages)
 
             seq = sender.send(msg, is_reliable=is_reliable)
-            print(f"[SENDER] Sent seq={seq} is_reliable={is_reliable} msg={msg}")
-            time.sleep(interval)
+            if debug:
+                log.debug("[SENDER] Sent seq=%d is_reliable=%s msg=%s", seq, is_reliable, msg)
+            next_send += interval
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
     except KeyboardInterrupt:
         pass
     finally:
         sender.close()
+        log_listener.stop()
         print()
         sender_summary = sender.metrics.summary()
         print(format_sender_summary(sender_summary))
         if args.metrics_json:
             try:
-                with open(args.metrics_json, "w") as f:
-                    json.dump(sender_summary, f, indent=2)
+                write_summary_json(sender_summary, args.metrics_json)
                 print(f"[SENDER] Wrote metrics JSON to {args.metrics_json}")
             except Exception as e:
                 print(f"[SENDER] Failed to write metrics JSON: {e}")
@@ -1,25 +1,88 @@
 # utils.py
+import logging
+import queue
+import socket
 import struct
+import sys
 import time
+from logging.handlers import QueueHandler, QueueListener
 
 HEADER_FORMAT = '!B H Q'  # ChannelType(1B), SeqNo(2B), Timestamp_ms(8B)
-HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+HEADER_STRUCT = struct.Struct(HEADER_FORMAT)  # Pre-compiled, avoids format lookup per packet
+HEADER_SIZE = HEADER_STRUCT.size
 RELIABLE_CHANNEL = 0
 UNRELIABLE_CHANNEL = 1
+ACK_PAYLOAD = b"ACK"
+# Batched ACK: ACK_PAYLOAD followed by a bitmap where bit i acks (header seq - i)
+ACK_BITMAP_STRUCT = struct.Struct('!Q')
+ACK_BITMAP_BITS = 64
+# Kernel UDP buffer size requested for every socket (capped by net.core.rmem_max/wmem_max)
+SOCKET_BUFFER_BYTES = 4 * 1024 * 1024
+# 16-bit sequence numbers shared by both channels
+SEQ_SPACE = 1 << 16
+SEQ_MASK = SEQ_SPACE - 1
+MAX_DATAGRAM_SIZE = 65536  # Size of preallocated send/receive buffers
+
+def tune_socket_buffers(sock):
+    # Larger kernel buffers so bursts are not dropped before Python reads them
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_BYTES)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_BYTES)
+
+def start_stdout_logging():
+    # Log records are queued and written to stdout by a listener thread, so the threads doing
+    # network I/O never block on the terminal. Stop the returned listener to flush it
+    records = queue.SimpleQueue()
+    logging.basicConfig(handlers=[QueueHandler(records)], format="%(message)s")
+    listener = QueueListener(records, logging.StreamHandler(sys.stdout))
+    listener.start()
+    return listener
 
 def now_ms():
-    return int(time.time() * 1000)
+    # Wall clock, since header timestamps are compared across sender and receiver processes;
+    # the integer clock skips the float multiply and its rounding
+    return time.time_ns() // 1000000
 
 def pack_packet(channel_type: int, seqno: int, timestamp_ms: int, payload: bytes) -> bytes:
-    header = struct.pack(HEADER_FORMAT, channel_type, seqno & 0xFFFF, timestamp_ms)
+    header = HEADER_STRUCT.pack(channel_type, seqno & SEQ_MASK, timestamp_ms)
     return header + payload
 
-def unpack_packet(data: bytes):
+def pack_header(channel_type: int, seqno: int, timestamp_ms: int) -> bytes:
+    # Header only, for scatter-gather sends that keep the payload in its own buffer
+    return HEADER_STRUCT.pack(channel_type, seqno & SEQ_MASK, timestamp_ms)
+
+def unpack_packet(data):
+    # data may be a memoryview over a reused receive buffer, so the payload is always copied out
     if len(data) < HEADER_SIZE:
         raise ValueError("Packet too short")
-    channel_type, seqno, timestamp = struct.unpack(HEADER_FORMAT, data[:HEADER_SIZE])
-    payload = data[HEADER_SIZE:]
+    channel_type, seqno, timestamp = HEADER_STRUCT.unpack_from(data)
+    payload = bytes(data[HEADER_SIZE:])
     return channel_type, seqno, timestamp, payload
 
-def increment_seq(seq):
-    return (seq + 1) & 0xFFFF
+def is_ack(data) -> bool:
+    # Checks the header and marker in place (data may be bytes or a memoryview)
+    return (len(data) >= HEADER_SIZE and data[0] == RELIABLE_CHANNEL
+            and data[HEADER_SIZE:HEADER_SIZE + len(ACK_PAYLOAD)] == ACK_PAYLOAD)
+
+def unpack_seq(data) -> int:
+    return HEADER_STRUCT.unpack_from(data)[1]
+
+def pack_ack(seqs, timestamp_ms: int) -> bytes:
+    # seqs must lie within ACK_BITMAP_BITS of each other; the newest becomes the header seq
+    base = seqs[0]
+    for s in seqs:
+        if (s - base) & SEQ_MASK < SEQ_SPACE // 2:
+            base = s
+    bitmap = 0
+    for s in seqs:
+        bitmap |= 1 << ((base - s) & SEQ_MASK)
+    return pack_packet(RELIABLE_CHANNEL, base, timestamp_ms,
+                       ACK_PAYLOAD + ACK_BITMAP_STRUCT.pack(bitmap))
+
+def unpack_ack_seqs(data):
+    seq = unpack_seq(data)
+    offset = HEADER_SIZE + len(ACK_PAYLOAD)
+    # Legacy single ACK carries no bitmap
+    if len(data) < offset + ACK_BITMAP_STRUCT.size:
+        return [seq]
+    bitmap = ACK_BITMAP_STRUCT.unpack_from(data, offset)[0]
+    return [(seq - i) & SEQ_MASK for i in range(ACK_BITMAP_BITS) if (bitmap >> i) & 1]